@@ -0,0 +1,183 @@
+"""Synthetic linter output for the benchmarks.
+
+The output is deterministic for a given size, and spreads diagnostics over files, lines and rules the way real
+projects do, so path and string caches see realistic hit rates.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from typing import Final
+
+FILES_PER_1K: Final[int] = 50
+# share of compiler diagnostics in headers, and with a note
+HEADER_RATIO: Final[float] = 0.2
+NOTE_RATIO: Final[float] = 0.3
+# compilers print a summary like "50 warnings generated." per translation unit
+DIAGNOSTICS_PER_UNIT: Final[int] = 50
+
+_RUFF_CODES: Final = [
+    ("F401", "`{name}` imported but unused", "unused-import"),
+    ("E501", "Line too long ({length} > 120)", "line-too-long"),
+    ("B006", "Do not use mutable data structures for argument defaults", "mutable-argument-default"),
+    (
+        "PLR2004",
+        "Magic value used in comparison, consider replacing `{length}` with a constant variable",
+        "magic-value-comparison",
+    ),
+    ("ANN001", "Missing type annotation for function argument `{name}`", "missing-type-function-argument"),
+]
+_PYRIGHT_RULES: Final = [
+    ("reportAttributeAccessIssue", 'Cannot access attribute "{name}" for class "Config"'),
+    ("reportArgumentType", 'Argument of type "int" cannot be assigned to parameter "{name}" of type "str"'),
+    ("reportOptionalMemberAccess", '"{name}" is not a known attribute of "None"'),
+    ("reportPossiblyUnbound", '"{name}" is possibly unbound'),
+]
+_MYPY_CODES: Final = [
+    ("arg-type", 'Argument 1 to "{name}" has incompatible type "int"; expected "str"'),
+    ("union-attr", 'Item "None" of "Optional[Config]" has no attribute "{name}"'),
+    ("no-untyped-def", "Function is missing a type annotation"),
+    ("misc", "List comprehension has incompatible type List[Result | None]; expected List[Promise]"),
+]
+_GCC_WARNINGS: Final = [
+    ("-Wsign-compare", "comparison of integers of different signs: 'int' and 'size_t' (aka 'unsigned long')"),
+    ("-Wunused-variable", "unused variable '{name}'"),
+    ("-Wshadow", "declaration of '{name}' shadows a member of 'Node'"),
+    ("-Wswitch-default", "'switch' missing 'default' label"),
+]
+_CLANG_TIDY_CHECKS: Final = [
+    ("readability-identifier-naming", "invalid case style for variable '{name}'"),
+    ("modernize-use-auto", "use auto when initializing with a cast to avoid duplicating the type name"),
+    (
+        "performance-unnecessary-value-param",
+        "the parameter '{name}' is copied for each invocation but only used as a const reference",
+    ),
+    (
+        "bugprone-narrowing-conversions",
+        "narrowing conversion from 'size_t' to signed type 'int' is implementation-defined",
+    ),
+]
+_NAMES: Final = ["value", "result", "config", "index", "buffer", "handler", "items", "request"]
+
+
+def _rng(size: int) -> random.Random:
+    # seeded by the size, the output does not need to be unpredictable
+    return random.Random(size)  # noqa: S311
+
+
+def _files(size: int, suffix: str) -> list[str]:
+    count = max(1, size * FILES_PER_1K // 1000)
+    return [f"src/module_{i // 20}/file_{i}{suffix}" for i in range(count)]
+
+
+def _fields(rng: random.Random) -> dict[str, object]:
+    return {"name": rng.choice(_NAMES), "length": rng.randint(121, 200)}
+
+
+def ruff(size: int) -> str:
+    rng = _rng(size)
+    files = _files(size, ".py")
+    items = []
+    for _ in range(size):
+        code, message, rule = rng.choice(_RUFF_CODES)
+        row, column = rng.randint(1, 2000), rng.randint(1, 80)
+        items.append({
+            "cell": None,
+            "code": code,
+            "end_location": {"column": column + 6, "row": row},
+            "filename": rng.choice(files),
+            "fix": None,
+            "location": {"column": column, "row": row},
+            "message": message.format(**_fields(rng)),
+            "noqa_row": row,
+            "url": f"https://docs.astral.sh/ruff/rules/{rule}",
+        })
+    return json.dumps(items, indent=2) + "\n"
+
+
+def pyright(size: int) -> str:
+    rng = _rng(size)
+    files = _files(size, ".py")
+    diagnostics = []
+    for _ in range(size):
+        rule, message = rng.choice(_PYRIGHT_RULES)
+        line, character = rng.randint(0, 2000), rng.randint(0, 80)
+        diagnostics.append({
+            "file": rng.choice(files),
+            "severity": "error",
+            "message": message.format(**_fields(rng)),
+            "range": {
+                "start": {"line": line, "character": character},
+                "end": {"line": line, "character": character + 8},
+            },
+            "rule": rule,
+        })
+    output = {
+        "version": "1.1.378",
+        "time": "1725119710426",
+        "generalDiagnostics": diagnostics,
+        "summary": {"filesAnalyzed": len(files), "errorCount": size, "warningCount": 0, "informationCount": 0},
+    }
+    return json.dumps(output, indent=4) + "\n"
+
+
+def mypy(size: int) -> str:
+    rng = _rng(size)
+    files = _files(size, ".py")
+    lines = []
+    for _ in range(size):
+        code, message = rng.choice(_MYPY_CODES)
+        lines.append(
+            json.dumps({
+                "file": rng.choice(files),
+                "line": rng.randint(1, 2000),
+                "column": rng.randint(0, 80),
+                "message": message.format(**_fields(rng)),
+                "hint": None,
+                "code": code,
+                "severity": "error",
+            })
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _compiler(size: int, diagnostics: list[tuple[str, str]], notes: bool) -> str:
+    rng = _rng(size)
+    sources = _files(size, ".cpp")
+    headers = _files(size // 10 or 1, ".hpp")
+    out = []
+    for i in range(size):
+        diagnostic, message = rng.choice(diagnostics)
+        path = rng.choice(sources)
+        if rng.random() < HEADER_RATIO:
+            # a header, with the include chain before it
+            out.append(f"In file included from {path}:{rng.randint(1, 30)}:")
+            path = rng.choice(headers)
+        line, column = rng.randint(1, 2000), rng.randint(1, 80)
+        out.extend((
+            f"{path}:{line}:{column}: warning: {message.format(**_fields(rng))} [{diagnostic}]",
+            f"{line:5} |     for (int i = 0; i < items.size(); ++i) {{",
+            f"      | {' ' * column}^",
+        ))
+        if notes and rng.random() < NOTE_RATIO:
+            note_line = rng.randint(1, 2000)
+            out.extend((
+                f"{path}:{note_line}:5: note: declared here",
+                f"{note_line:5} |     int {rng.choice(_NAMES)};",
+                "      |     ^",
+            ))
+        if i % DIAGNOSTICS_PER_UNIT == DIAGNOSTICS_PER_UNIT - 1:
+            out.append(f"{DIAGNOSTICS_PER_UNIT} warnings generated.")
+    return "\n".join(out) + "\n"
+
+
+def gcc(size: int) -> str:
+    return _compiler(size, _GCC_WARNINGS, notes=True)
+
+
+def clang_tidy(size: int) -> str:
+    return _compiler(size, _CLANG_TIDY_CHECKS, notes=False)
+
+
+GENERATORS: Final = {"ruff": ruff, "pyright": pyright, "mypy": mypy, "gcc": gcc, "clang-tidy": clang_tidy}
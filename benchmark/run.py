@@ -0,0 +1,246 @@
+"""Measure throughput and peak memory of the parsers, fingerprinting and report writing.
+
+Usage:
+
+    $ python benchmark/run.py [--sizes 1000,10000,100000] [--baseline benchmark/baseline.json] [--save file_path]
+
+Each case is timed on its own (best of --repeat runs, and of more runs for cases faster than 0.5 seconds) and run
+again under tracemalloc for the peak memory (the lowest of 3 runs).
+With --baseline, cases slower or bigger than the baseline by more than --tolerance are reported and the exit code
+is 1. Throughput is compared relative to a calibration workload timed before each case in both runs (the median of
+the compared cases), so that a baseline recorded on a faster or slower machine still applies.
+Peak memory is compared only with a baseline of the same Python version.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate import GENERATORS
+
+from gitlab_cq import GitLabCodeQuality, report
+from gitlab_cq.capture import CHUNK_SIZE
+from gitlab_cq.gcc import Parser as GccParser
+from gitlab_cq.mypy import Parser as MypyParser
+from gitlab_cq.pyright import Parser as PyrightParser
+from gitlab_cq.record import IssueRecord, as_issues
+from gitlab_cq.ruff import Parser as RuffParser
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from gitlab_cq.stream import StreamParser
+
+DEFAULT_SIZES: Final[str] = "1000,10000,100000"
+DEFAULT_BASELINE: Final[Path] = Path(__file__).resolve().parent / "baseline.json"
+# each case runs at least --repeat times and this long in total
+MIN_SECONDS: Final[float] = 0.5
+# runs under tracemalloc, the lowest peak is used: the interpreter grows tables like the one of interned strings
+# during some runs, e.g. by 0.4 MiB for 1000 ruff issues
+MEMORY_RUNS: Final[int] = 3
+# runs of the calibration workload, the best is used
+CALIBRATION_REPEAT: Final[int] = 5
+
+_PARSERS: Final[dict[str, Callable[[], StreamParser]]] = {
+    "ruff": RuffParser,
+    "pyright": PyrightParser,
+    "mypy": MypyParser,
+    "gcc": lambda: GccParser("gcc", "major"),
+    "clang-tidy": lambda: GccParser("clang-tidy", "minor"),
+}
+
+
+def _chunks(text: str) -> list[str]:
+    # the size of the chunks read from a linter
+    return [text[i : i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE)]
+
+
+def _records(size: int) -> list[IssueRecord]:
+    return list(GccParser("gcc", "major").parse(_chunks(GENERATORS["gcc"](size))))
+
+
+def _parse_case(make_parser: Callable[[], StreamParser], chunks: list[str]) -> Callable[[], int]:
+    return lambda: sum(1 for _ in make_parser().parse(chunks))
+
+
+def _cases(size: int, directory: Path) -> dict[str, Callable[[], int]]:
+    # each case returns the number of issues processed
+    cases: dict[str, Callable[[], int]] = {}
+    for linter, make_parser in _PARSERS.items():
+        chunks = _chunks(GENERATORS[linter](size))
+        cases[f"parse-{linter}"] = _parse_case(make_parser, chunks)
+
+    records = _records(size)
+    issues = as_issues(records)
+
+    def fingerprint_records() -> int:
+        for record in records:
+            record.add_fingerprint()
+        return len(records)
+
+    def fingerprint_issues() -> int:
+        GitLabCodeQuality.add_fingerprints(issues)
+        return len(issues)
+
+    base_report = json.dumps(issues)
+    report_path = directory / "report.json"
+    merge_path = directory / "merge.json"
+    spool_path = directory / "spool.jsonl"
+
+    def write() -> int:
+        with report.open_writer(report_path) as writer:
+            writer.write_all(records)
+        return len(records)
+
+    def merge() -> int:
+        # merge into a report of the same size
+        merge_path.write_text(base_report, encoding="utf-8")
+        with report.open_writer(merge_path, merge=True) as writer:
+            writer.write_all(records)
+        return 2 * len(records)
+
+    def finalize() -> int:
+        with report.open_writer(spool_path) as writer:
+            writer.write_all(records)
+        return report.finalize([spool_path], directory / "finalized.json")
+
+    cases.update({
+        "fingerprint-records": fingerprint_records,
+        "fingerprint-issues": fingerprint_issues,
+        "write": write,
+        "merge": merge,
+        "finalize": finalize,
+    })
+    return cases
+
+
+def _measure(case: Callable[[], int], repeat: int, memory: bool) -> dict[str, float]:
+    best = float("inf")
+    count = 0
+    runs = 0
+    total = 0.0
+    # short cases are repeated more, a single run of a few milliseconds is mostly noise
+    while runs < repeat or total < MIN_SECONDS:
+        gc.collect()
+        start = time.perf_counter()
+        count = case()
+        seconds = time.perf_counter() - start
+        best = min(best, seconds)
+        total += seconds
+        runs += 1
+    result = {"issues": count, "seconds": best, "issues_per_sec": count / best if best else 0.0}
+    if memory:
+        peaks = []
+        for _ in range(MEMORY_RUNS):
+            gc.collect()
+            tracemalloc.start()
+            case()
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        result["peak_memory"] = min(peaks)
+    return result
+
+
+def _calibrate() -> float:
+    # pure Python work like parsing: decoding JSON, matching lines and building dicts, independent of gitlab_cq
+    lines = [json.dumps({"file": f"src/m{i % 50}.py", "line": i, "message": f"message {i}"}) for i in range(5000)]
+    pattern = re.compile(r"m(\d+)\.py")
+
+    def workload() -> int:
+        counts: dict[str, int] = {}
+        for line in lines:
+            obj = json.loads(line)
+            match = pattern.search(obj["file"])
+            if match:
+                counts[match.group(1)] = counts.get(match.group(1), 0) + obj["line"]
+        return len(lines)
+
+    return _measure(workload, CALIBRATION_REPEAT, memory=False)["issues_per_sec"]
+
+
+def _compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    memory = baseline["python"] == platform.python_version()
+    if not memory:
+        sys.stderr.write(f"Peak memory not compared, the baseline was recorded with Python {baseline['python']}\n")
+    compared = {name: result for name, result in results["cases"].items() if name in baseline["cases"]}
+    if not compared:
+        return regressions
+    # the speed of this machine relative to the machine of the baseline; a single calibration varies too much on a
+    # shared runner
+    scale = statistics.median(baseline["cases"][name]["calibration"] for name in compared) / statistics.median(
+        result["calibration"] for result in compared.values()
+    )
+    for name, result in compared.items():
+        expected = baseline["cases"][name]
+        if result["issues_per_sec"] * scale < expected["issues_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['issues_per_sec'] * scale:.0f} issues/sec on the machine of the baseline, "
+                f"baseline {expected['issues_per_sec']:.0f}"
+            )
+        if (
+            memory
+            and "peak_memory" in result
+            and "peak_memory" in expected
+            and result["peak_memory"] > expected["peak_memory"] * (1 + tolerance)
+        ):
+            regressions.append(
+                f"{name}: {result['peak_memory'] / 2**20:.1f} MiB peak, "
+                f"baseline {expected['peak_memory'] / 2**20:.1f} MiB"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"numbers of diagnostics (default: {DEFAULT_SIZES})")
+    parser.add_argument("--cases", default="", help="comma separated cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the best is reported (default: 3)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--baseline", type=Path, help=f"compare with results saved by --save, e.g. {DEFAULT_BASELINE}")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression ratio (default: 0.25)")
+    parser.add_argument("--save", type=Path, help="save the results as JSON")
+    args = parser.parse_args()
+
+    selected = set(filter(None, args.cases.split(",")))
+    cases: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in map(int, args.sizes.split(",")):
+            for name, case in _cases(size, Path(directory)).items():
+                if selected and name not in selected:
+                    continue
+                calibration = _calibrate()
+                result = _measure(case, args.repeat, not args.no_memory)
+                result["calibration"] = calibration
+                cases[f"{name}/{size}"] = result
+                memory = f"{result['peak_memory'] / 2**20:9.1f} MiB" if "peak_memory" in result else ""
+                sys.stdout.write(f"{name + '/' + str(size):32} {result['issues_per_sec']:12.0f} issues/sec{memory}\n")
+                sys.stdout.flush()
+
+    results: dict[str, Any] = {"python": platform.python_version(), "cases": cases}
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = _compare(results, baseline, args.tolerance)
+        if regressions:
+            sys.stderr.write("Regressions:\n" + "".join(f"  {line}\n" for line in regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
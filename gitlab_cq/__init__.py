@@ -1,13 +1,35 @@
 from __future__ import annotations
 
-from hashlib import md5
-from typing import Literal, TypedDict
+from typing import TYPE_CHECKING, ClassVar, Final, Literal, TypedDict, get_args
 
+# needed at runtime to resolve the type hints of the issue TypedDicts
 from typing_extensions import NotRequired
 
 from .__version__ import __version__
 
-__all__ = ["GitLabCodeQuality", "__version__"]
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from typing_extensions import Protocol
+
+    from .aio import LinterError, iter_issues, run
+
+    class _Hash(Protocol):
+        def hexdigest(self) -> str: ...
+
+
+__all__ = [
+    "FINGERPRINT_SCHEMES",
+    "FingerprintScheme",
+    "GitLabCodeQuality",
+    "LinterError",
+    "__version__",
+    "iter_issues",
+    "run",
+]
+
+FingerprintScheme = Literal["md5", "blake2b", "xxh3"]
+FINGERPRINT_SCHEMES: Final[tuple[FingerprintScheme, ...]] = get_args(FingerprintScheme)
 
 
 class GitLabCodeQuality:
@@ -62,30 +84,80 @@ class GitLabCodeQuality:
         severity: NotRequired[Literal["info", "minor", "major", "critical", "blocker"]]
         fingerprint: NotRequired[str]
 
+    # hash used by add_fingerprint; "md5" reproduces the fingerprints of earlier versions
+    fingerprint_scheme: ClassVar[FingerprintScheme] = "md5"
+
+    @staticmethod
+    def set_fingerprint_scheme(scheme: FingerprintScheme) -> None:
+        # fail early if the hash is unavailable
+        GitLabCodeQuality.hasher(scheme)
+        GitLabCodeQuality.fingerprint_scheme = scheme
+
+    @staticmethod
+    def hasher(scheme: FingerprintScheme | None = None) -> Callable[[bytes], _Hash]:
+        scheme = scheme or GitLabCodeQuality.fingerprint_scheme
+        return _hashers.get(scheme) or _load_hasher(scheme)
+
+    @staticmethod
+    def fingerprint_data(issue: GitLabCodeQuality.Issue) -> bytes:
+        return _fingerprint_data(issue)
+
     @staticmethod
-    def add_fingerprint(issue: GitLabCodeQuality.Issue) -> None:
-        if issue["location"].get("lines") is not None:
-            fingerprint = md5(  # noqa: S324
-                (
-                    issue["check_name"]
-                    + issue["description"]
-                    + issue["location"]["path"]
-                    + str(issue["location"]["lines"]["begin"])  # type: ignore
-                    + str(issue["location"]["lines"]["end"])  # type: ignore
-                ).encode("utf-8")
-            )
-        elif issue["location"].get("positions") is not None:
-            fingerprint = md5(  # noqa: S324
-                (
-                    issue["check_name"]
-                    + issue["description"]
-                    + issue["location"]["path"]
-                    + str(issue["location"]["positions"]["begin"]["line"])  # type: ignore
-                    + str(issue["location"]["positions"]["begin"]["column"])  # type: ignore
-                    + str(issue["location"]["positions"]["end"]["line"])  # type: ignore
-                    + str(issue["location"]["positions"]["end"]["column"])  # type: ignore
-                ).encode("utf-8")
-            )
-        else:
-            raise ValueError("could not find location")
-        issue["fingerprint"] = fingerprint.hexdigest()
+    def add_fingerprint(issue: GitLabCodeQuality.Issue, scheme: FingerprintScheme | None = None) -> None:
+        hasher = GitLabCodeQuality.hasher(scheme)
+        issue["fingerprint"] = hasher(_fingerprint_data(issue)).hexdigest()
+
+    @staticmethod
+    def add_fingerprints(issues: Iterable[GitLabCodeQuality.Issue], scheme: FingerprintScheme | None = None) -> None:
+        hasher = GitLabCodeQuality.hasher(scheme)
+        for issue in issues:
+            issue["fingerprint"] = hasher(_fingerprint_data(issue)).hexdigest()
+
+
+def _fingerprint_data(issue: GitLabCodeQuality.Issue) -> bytes:
+    # one formatted string instead of concatenating each field
+    location = issue["location"]
+    lines = location.get("lines")
+    if lines is not None:
+        return f"{issue['check_name']}{issue['description']}{location['path']}{lines['begin']}{lines['end']}".encode()  # type: ignore
+    positions = location.get("positions")
+    if positions is not None:
+        begin = positions["begin"]  # type: ignore
+        end = positions["end"]  # type: ignore
+        return (
+            f"{issue['check_name']}{issue['description']}{location['path']}"
+            f"{begin['line']}{begin['column']}{end['line']}{end['column']}"
+        ).encode()
+    raise ValueError("could not find location")
+
+
+# hash constructors by scheme, loaded on first use; each digest is 16 bytes (32 hex digits) like md5
+_hashers: dict[str, Callable[[bytes], _Hash]] = {}
+
+
+def _load_hasher(scheme: str) -> Callable[[bytes], _Hash]:
+    hasher: Callable[[bytes], _Hash]
+    if scheme in {"md5", "blake2b"}:
+        import hashlib  # noqa: PLC0415
+        from functools import partial  # noqa: PLC0415
+
+        hasher = hashlib.md5 if scheme == "md5" else partial(hashlib.blake2b, digest_size=16)
+    elif scheme == "xxh3":
+        try:
+            import xxhash  # noqa: PLC0415
+        except ImportError as e:
+            raise ValueError("fingerprint scheme xxh3 requires the xxhash package") from e
+        hasher = xxhash.xxh3_128
+    else:
+        raise ValueError(f"fingerprint scheme {scheme} is not supported")
+    _hashers[scheme] = hasher
+    return hasher
+
+
+def __getattr__(name: str) -> object:
+    # the asyncio API is imported on first use, the CLI does not need asyncio
+    if name in {"LinterError", "iter_issues", "run"}:
+        from . import aio  # noqa: PLC0415
+
+        return getattr(aio, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
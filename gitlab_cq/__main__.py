@@ -1,52 +1,667 @@
 from __future__ import annotations
 
-import json
-import subprocess  # noqa: S404
+import io
+import os
 import sys
-import time
+import threading
+from contextlib import ExitStack, nullcontext
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-from typing import TYPE_CHECKING, Final, Literal, get_args
-
-from .gcc import parse as parse_gcc
-from .mypy import parse as parse_mypy
-from .pyright import parse as parse_pyright
-from .ruff import parse as parse_ruff
+from typing import TYPE_CHECKING, Final, NamedTuple
+
+from . import FINGERPRINT_SCHEMES, GitLabCodeQuality, capture, compress, paths, report, stats
+from .limit import GROUPS, IssueLimit
+from .linters import (
+    COMPILERS,
+    SUPPORTED_LINTERS,
+    add_required_arguments,
+    failed,
+    find_linter,
+    make_parser,
+    parser_module,
+)
 
 if TYPE_CHECKING:
-    from . import GitLabCodeQuality
-
-_SUPPORTED_LINTERS = Literal["ruff", "pyright", "mypy", "gcc", "clang-tidy", "clang"]
-SUPPORTED_LINTERS: Final[tuple[_SUPPORTED_LINTERS, ...]] = get_args(_SUPPORTED_LINTERS)
-
-
-def _parse_option_args(argv: list[str]) -> tuple[str, bool, bool]:
-    output_file = ""
-    merge = False
-    echo = False
+    from collections.abc import Iterable, Iterator
+    from typing import IO, Any
+
+    from . import FingerprintScheme, incremental, tidy
+    from .limit import Group
+    from .linters import Linter
+    from .record import AnyIssue, IssueRecord
+    from .server import Collector
+    from .stream import StreamParser
+
+COMMAND_SEPARATOR: Final[str] = "--"
+
+# keep output of linters running in parallel from interleaving
+_echo_lock: Final = threading.Lock()
+
+
+class _Result(NamedTuple):
+    issues: list[IssueRecord]
+    returncode: int | None
+    # the linter failed instead of reporting issues, see linters.failed
+    failed: bool
+
+
+class _Options:
+    output_file: str = ""
+    merge: bool = False
+    echo: bool = False
+    parallel: int = 0
+    baseline: str = ""
+    fingerprint: FingerprintScheme = "md5"
+    root: str = ""
+    parse_jobs: int = 1
+    input_file: str = ""
+    count_duplicates: bool = False
+    # "" to write statistics to stderr
+    stats: str | None = None
+    server: str = ""
+    changed_since: str = ""
+    cache: str = ""
+    jobs: int = 1
+    compile_commands: str = ""
+    compression_level: int | None = None
+    max_issues: int = 0
+    max_issues_per: Group | None = None
+    sort: bool = False
+
+
+def _parse_option_args(argv: list[str]) -> _Options:
+    options = _Options()
 
     while len(argv) > 0:
         if argv[0] == "--output":
             if len(argv) == 1 or argv[1].startswith("--"):
                 sys.stderr.write("No output file specified\n")
                 sys.exit(1)
-            output_file = argv[1]
+            options.output_file = argv[1]
             argv.pop(0)
             argv.pop(0)
         elif argv[0] == "--merge":
-            merge = True
+            options.merge = True
             argv.pop(0)
         elif argv[0] == "--echo":
-            echo = True
+            options.echo = True
+            argv.pop(0)
+        elif argv[0] == "--sort":
+            options.sort = True
+            argv.pop(0)
+        elif argv[0] == "--baseline":
+            if len(argv) == 1 or argv[1].startswith("--"):
+                sys.stderr.write("No baseline file specified\n")
+                sys.exit(1)
+            options.baseline = argv[1]
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--fingerprint":
+            if len(argv) == 1 or argv[1] not in FINGERPRINT_SCHEMES:
+                sys.stderr.write(
+                    f"No valid fingerprint scheme specified; choose from {', '.join(FINGERPRINT_SCHEMES)}\n"
+                )
+                sys.exit(1)
+            options.fingerprint = argv[1]  # type: ignore
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--root":
+            if len(argv) == 1 or argv[1].startswith("--"):
+                sys.stderr.write("No root directory specified\n")
+                sys.exit(1)
+            options.root = argv[1]
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--parallel":
+            if len(argv) == 1 or not argv[1].isdigit() or int(argv[1]) == 0:
+                sys.stderr.write("No valid number of parallel linters specified\n")
+                sys.exit(1)
+            options.parallel = int(argv[1])
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--stats" or argv[0].startswith("--stats="):
+            options.stats = argv[0].partition("=")[2]
+            argv.pop(0)
+        elif argv[0] == "--count-duplicates":
+            options.count_duplicates = True
+            argv.pop(0)
+        elif argv[0] == "--input":
+            if len(argv) == 1 or argv[1].startswith("--"):
+                sys.stderr.write("No input file specified\n")
+                sys.exit(1)
+            options.input_file = argv[1]
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--server":
+            if len(argv) == 1 or argv[1].startswith("--"):
+                sys.stderr.write("No socket path specified\n")
+                sys.exit(1)
+            options.server = argv[1]
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--changed-since":
+            if len(argv) == 1 or argv[1].startswith("--"):
+                sys.stderr.write("No git ref specified\n")
+                sys.exit(1)
+            options.changed_since = argv[1]
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--cache":
+            if len(argv) == 1 or argv[1].startswith("--"):
+                sys.stderr.write("No cache directory specified\n")
+                sys.exit(1)
+            options.cache = argv[1]
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--jobs":
+            if len(argv) == 1 or not argv[1].isdigit() or int(argv[1]) == 0:
+                sys.stderr.write("No valid number of jobs specified\n")
+                sys.exit(1)
+            options.jobs = int(argv[1])
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--compile-commands":
+            if len(argv) == 1 or argv[1].startswith("--"):
+                sys.stderr.write("No compilation database specified\n")
+                sys.exit(1)
+            options.compile_commands = argv[1]
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--max-issues":
+            if len(argv) == 1 or not argv[1].isdigit() or int(argv[1]) == 0:
+                sys.stderr.write("No valid maximum number of issues specified\n")
+                sys.exit(1)
+            options.max_issues = int(argv[1])
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--max-issues-per":
+            if len(argv) == 1 or argv[1] not in GROUPS:
+                sys.stderr.write(f"No valid group of --max-issues specified; choose from {', '.join(GROUPS)}\n")
+                sys.exit(1)
+            options.max_issues_per = argv[1]  # type: ignore
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--compression-level":
+            if len(argv) == 1 or not argv[1].lstrip("-").isdigit():
+                sys.stderr.write("No valid compression level specified\n")
+                sys.exit(1)
+            options.compression_level = int(argv[1])
+            argv.pop(0)
+            argv.pop(0)
+        elif argv[0] == "--parse-jobs":
+            if len(argv) == 1 or not argv[1].isdigit() or int(argv[1]) == 0:
+                sys.stderr.write("No valid number of parse jobs specified\n")
+                sys.exit(1)
+            options.parse_jobs = int(argv[1])
+            argv.pop(0)
             argv.pop(0)
         else:
             break
 
-    if not output_file and (echo or merge):
+    # the output of a client is written by the daemon
+    if not options.output_file and not options.server and (options.echo or options.merge):
         sys.stderr.write("No output file specified with --echo or --merge\n")
         sys.exit(1)
 
-    return output_file, merge, echo
+    # options are set only when given; the daemon runs, limits and writes the issues with the options of serve
+    if options.server and set(vars(options)) - {"server", "echo", "input_file"}:
+        sys.stderr.write("Only --echo and --input can be given with --server, give other options to serve\n")
+        sys.exit(1)
+
+    if options.max_issues_per and not options.max_issues:
+        sys.stderr.write("No maximum number of issues specified with --max-issues-per\n")
+        sys.exit(1)
+
+    if options.output_file:
+        try:
+            compress.check(compress.compression_of(options.output_file), options.compression_level)
+        except ValueError as e:
+            sys.stderr.write(f"{e}\n")
+            sys.exit(1)
+
+    return options
+
+
+def _make_limit(options: _Options) -> IssueLimit | None:
+    return IssueLimit(options.max_issues, options.max_issues_per) if options.max_issues else None
+
+
+def _make_parser(linter: str, options: _Options | None = None) -> StreamParser:
+    options = options or _Options()
+    return make_parser(linter, options.parse_jobs, options.count_duplicates)
+
+
+def _is_linter_executable(arg: str) -> bool:
+    # an executable like ruff, /usr/bin/clang-tidy-18 or mypy.exe, not an option or a file like tests/test_mypy.py
+    name = Path(arg).name
+    if name.lower().endswith(".exe"):
+        name = name[: -len(".exe")]
+    return not arg.startswith("-") and "." not in name and find_linter(name) is not None
+
+
+def _split_commands(argv: list[str]) -> list[list[str]]:
+    # a separator followed by the executable of another linter starts a new command
+    commands: list[list[str]] = [[]]
+    for i, arg in enumerate(argv):
+        if arg == COMMAND_SEPARATOR and commands[-1] and i + 1 < len(argv) and _is_linter_executable(argv[i + 1]):
+            commands.append([])
+        else:
+            commands[-1].append(arg)
+    return commands
+
+
+def _parse_output(
+    linter: Linter,
+    linter_output: Iterable[str],
+    linter_proc: capture.Capture | None = None,
+    options: _Options | None = None,
+) -> Iterator[IssueRecord]:
+    # parse linter output while it is produced
+    with ExitStack() as stack:
+        if linter_proc is not None:
+            stack.enter_context(linter_proc)
+        try:
+            parser = stats.get().parser(_make_parser(linter, options), linter)
+            yield from parser.parse(stats.get().chunks(linter_output))
+        except ValueError as e:
+            if linter_proc is not None:
+                # stop the linter and collect its stderr
+                stack.close()
+                message = "Failed to parse linter output with command: " + " ".join(linter_proc.args)
+                if linter_proc.stderr:
+                    message += "\nStderr:\n" + linter_proc.stderr
+                raise RuntimeError(message) from e
+            raise RuntimeError("Failed to parse linter output with std input") from e
+
+
+def _read_input_file(linter: Linter, path: str) -> Iterator[str]:
+    if linter in COMPILERS:
+        # build logs may be huge, decode them block by block from a memory map
+        yield from parser_module(linter).read_file(path)
+        return
+    with Path(path).open("rb") as f:
+        yield from capture.read_chunks(f)
+
+
+def _run_linter(
+    linter: Linter, command: list[str], echo: bool, options: _Options | None = None
+) -> tuple[Iterator[IssueRecord], capture.Capture]:
+    # the exit code of the linter is known once the issues are consumed
+    cmd, *arguments = command
+    arguments = add_required_arguments(linter, arguments)
+
+    # run linter; keep stderr apart from JSON output, compilers report diagnostics on stderr
+    linter_proc = capture.Capture([cmd, *arguments], merge_stderr=linter in COMPILERS, echo=echo)
+    return _parse_reported(linter, linter_proc, options), linter_proc
+
+
+def _parse_reported(linter: Linter, linter_proc: capture.Capture, options: _Options | None) -> Iterator[IssueRecord]:
+    yield from _parse_output(linter, linter_proc, linter_proc, options)
+    _report_failed(linter, linter_proc, sys.stderr)
+
+
+def _failed(linter: Linter, linter_proc: capture.Capture) -> bool:
+    return failed(linter, linter_proc.returncode, linter_proc.output_size > 0)
+
+
+def _report_failed(linter: Linter, linter_proc: capture.Capture, stderr: IO[str]) -> None:
+    # exit codes of reported issues are expected, only a failing linter is reported
+    if _failed(linter, linter_proc):
+        output = "" if linter_proc.output_size else " and no output"
+        stderr.write(f"{' '.join(linter_proc.args)}: failed with exit code {linter_proc.returncode}{output}\n")
+
+
+def _run_linter_buffered(
+    linter: Linter,
+    command: list[str],
+    echo: bool,
+    options: _Options | None = None,
+    cwd: str | None = None,
+    stdout: IO[str] | None = None,
+    stderr: IO[str] | None = None,
+) -> _Result:
+    cmd, *arguments = command
+    arguments = add_required_arguments(linter, arguments)
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+
+    # hold back echoed output until the linter exits
+    echoed: list[str] = []
+
+    def _tee(chunks: Iterable[str]) -> Iterator[str]:
+        for chunk in chunks:
+            echoed.append(chunk)
+            yield chunk
+
+    linter_proc = capture.Capture([cmd, *arguments], merge_stderr=linter in COMPILERS, cwd=cwd)
+    try:
+        # paths are relative to the directory the linter runs in
+        with paths.working_directory(cwd) if cwd is not None else nullcontext():
+            issues = list(_parse_output(linter, _tee(linter_proc) if echo else linter_proc, linter_proc, options))
+    finally:
+        with _echo_lock:
+            if echo:
+                stdout.write("".join(echoed))
+                stdout.flush()
+                stderr.write(linter_proc.stderr)
+            _report_failed(linter, linter_proc, stderr)
+            stderr.flush()
+    return _Result(issues, linter_proc.returncode, _failed(linter, linter_proc))
+
+
+def _run_linters(
+    linters: list[Linter],
+    commands: list[list[str]],
+    echo: bool,
+    parallel: int,
+    options: _Options | None = None,
+    cwd: str | None = None,
+    stdout: IO[str] | None = None,
+    stderr: IO[str] | None = None,
+) -> Iterator[IssueRecord]:
+    for result in _run_commands(linters, commands, echo, parallel, options, cwd, stdout, stderr):
+        yield from result.issues
+
+
+def _run_commands(
+    linters: list[Linter],
+    commands: list[list[str]],
+    echo: bool,
+    parallel: int,
+    options: _Options | None = None,
+    cwd: str | None = None,
+    stdout: IO[str] | None = None,
+    stderr: IO[str] | None = None,
+) -> Iterator[_Result]:
+    # result of each command, failed if any of its shards failed
+    from concurrent.futures import ThreadPoolExecutor  # noqa: PLC0415
+
+    jobs = options.jobs if options is not None and cwd is None else 1
+    shards = [[command] for command in commands]
+    if jobs > 1:
+        from .shard import shard_command  # noqa: PLC0415
+
+        # run each command as several linter processes on parts of its files
+        shards = [shard_command(linter, command, jobs) for linter, command in zip(linters, commands)]
+
+    # idle workers take the next shard from the queue of the executor
+    with ThreadPoolExecutor(max_workers=jobs if jobs > 1 else parallel or len(commands)) as executor:
+        futures = [
+            [
+                executor.submit(_run_linter_buffered, linter, shard, echo, options, cwd, stdout, stderr)
+                for shard in command_shards
+            ]
+            for linter, command_shards in zip(linters, shards)
+        ]
+        # merge in the order of the command line and of the shards
+        for command_futures in futures:
+            # leave the phase before the issues are written
+            with stats.get().phase("linters"):
+                results = [future.result() for future in command_futures]
+            yield _Result(
+                [issue for result in results for issue in result.issues],
+                max((result.returncode or 0 for result in results), default=0),
+                any(result.failed for result in results),
+            )
+
+
+def _run_incremental(
+    linters: list[Linter], commands: list[list[str]], echo: bool, options: _Options
+) -> Iterator[AnyIssue]:
+    from . import incremental  # noqa: PLC0415
+
+    cache = options.cache or Path(paths.get_resolver().root, incremental.CACHE_DIRECTORY)
+    # fail before anything is written if git fails
+    plans = [
+        incremental.Plan(linter, command, options.changed_since, cache) for linter, command in zip(linters, commands)
+    ]
+    return _run_planned(linters, plans, echo, options)
+
+
+def _run_planned(
+    linters: list[Linter], plans: list[incremental.Plan], echo: bool, options: _Options
+) -> Iterator[AnyIssue]:
+    planned = [(linter, plan.command, plan) for linter, plan in zip(linters, plans) if plan.command is not None]
+    failed_plans: list[incremental.Plan] = []
+    if len(plans) == 1 and options.jobs == 1:
+        # parse while the linter runs, as without a cache
+        for linter, command, plan in planned:
+            issues, linter_proc = _run_linter(linter, command, echo, options)
+            yield from plan.add(issues)
+            if _failed(linter, linter_proc):
+                failed_plans.append(plan)
+    else:
+        results = _run_commands(
+            [linter for linter, _, _ in planned],
+            [command for _, command, _ in planned],
+            echo,
+            options.parallel,
+            options,
+        )
+        for (_, _, plan), result in zip(planned, results):
+            yield from plan.add(result.issues)
+            if result.failed:
+                failed_plans.append(plan)
+
+    # issues of unchanged files, once the linters succeeded
+    for plan in plans:
+        if plan not in failed_plans:
+            yield from plan.cached()
+            plan.save()
+    # the cache is left as it is, and the files of a failed command are linted without it
+    retry = [plan for plan in failed_plans if plan.command != plan.full_command]
+    if not retry:
+        return
+    for plan in retry:
+        sys.stderr.write(f"{' '.join(plan.full_command)}: linting all files, the linter failed on the changed files\n")
+    results = _run_commands(
+        [plan.linter for plan in retry], [plan.full_command for plan in retry], echo, options.parallel, options
+    )
+    for result in results:
+        yield from result.issues
+
+
+def _run_compile_commands(command: list[str], echo: bool, options: _Options) -> Iterator[AnyIssue]:
+    from . import tidy  # noqa: PLC0415
+    from .incremental import CACHE_DIRECTORY, split_arguments  # noqa: PLC0415
+
+    cmd, *arguments = command
+    tidy_options, files = split_arguments("clang-tidy", arguments)
+    if "-p" not in tidy_options and not any(option.startswith("-p=") for option in tidy_options):
+        tidy_options = ["-p", str(Path(options.compile_commands).absolute().parent), *tidy_options]
+    units = tidy.load_units(options.compile_commands)
+    if files:
+        # only the units given to clang-tidy
+        selected = {os.path.normpath(Path(file).absolute()) for file in files}
+        units = [unit for unit in units if unit.file in selected]
+    cache_directory = options.cache or Path(paths.get_resolver().root, CACHE_DIRECTORY)
+    cache = tidy.UnitCache(cache_directory, [cmd, *tidy_options])
+    return _run_units(units, [cmd, *tidy_options], cache, echo, options)
+
+
+def _run_unit(
+    unit: tidy.Unit, command: list[str], cache: tidy.UnitCache, echo: bool, options: _Options
+) -> list[IssueRecord]:
+    from . import tidy  # noqa: PLC0415
+
+    result = _run_linter_buffered("clang-tidy", tidy.unit_command(command, unit), echo, options)
+    if result.failed:
+        # e.g. killed, or a compile command it cannot run; no issues does not mean a clean unit
+        return result.issues
+    headers = tidy.dependencies(unit)
+    if headers is not None:
+        cache.put(unit, headers, result.issues)
+    return result.issues
+
+
+def _run_units(
+    units: list[tidy.Unit], command: list[str], cache: tidy.UnitCache, echo: bool, options: _Options
+) -> Iterator[AnyIssue]:
+    from concurrent.futures import ThreadPoolExecutor, wait  # noqa: PLC0415
+
+    # one clang-tidy process per unit not found in the cache
+    with ThreadPoolExecutor(max_workers=options.jobs if options.jobs > 1 else os.cpu_count()) as executor:
+        results = [
+            (cached, None if cached is not None else executor.submit(_run_unit, unit, command, cache, echo, options))
+            for unit, cached in ((unit, cache.get(unit)) for unit in units)
+        ]
+        # in the order of the compilation database
+        for cached, future in results:
+            if future is None:
+                yield from cached  # type: ignore
+                continue
+            # only waiting for clang-tidy is timed, not the consumer of the issues
+            with stats.get().phase("linters"):
+                wait([future])
+            yield from future.result()
+
+
+def _find_linters(commands: list[list[str]]) -> list[Linter]:
+    linters: list[Linter] = []
+    for command in commands:
+        found = find_linter(command[0])
+        if found is None:
+            raise ValueError(f"Invalid linter command; {command[0]} is not supported")
+        linters.append(found)
+    return linters
+
+
+def _check_linter_name(linter: str) -> Linter:
+    if linter not in SUPPORTED_LINTERS:
+        raise ValueError(f"Invalid linter name; {linter} is not supported")
+    return linter  # type: ignore
+
+
+def _serve_request(request: dict[str, Any], body: IO[bytes], collector: Collector, options: _Options) -> dict[str, Any]:
+    # parse or run linters in the working directory of the client
+    cwd = request.get("cwd") or str(Path.cwd())
+    response: dict[str, Any] = {}
+    with paths.working_directory(cwd):
+        action = request.get("action")
+        if action == "parse":
+            linter = _check_linter_name(request.get("linter", ""))
+            issues = _parse_output(linter, capture.read_chunks(body), options=options)
+        elif action == "input":
+            linter = _check_linter_name(request.get("linter", ""))
+            issues = _parse_output(linter, _read_input_file(linter, str(Path(cwd, request["path"]))), options=options)
+        elif action == "run":
+            commands: list[list[str]] = request["commands"]
+            stdout, stderr = io.StringIO(), io.StringIO()
+            issues = _run_linters(
+                _find_linters(commands),
+                commands,
+                request.get("echo", False),
+                options.parallel,
+                options,
+                cwd,
+                stdout,
+                stderr,
+            )
+            response.update(stdout=stdout, stderr=stderr)
+        else:
+            raise ValueError(f"Invalid request; {action} is not supported")
+        # parse outside of the lock of the collector
+        response["issues"] = collector.add(list(issues))
+    # output of the linters for --echo
+    return {key: value.getvalue() if isinstance(value, io.StringIO) else value for key, value in response.items()}
+
+
+def _serve(options: _Options, socket_path: str, baseline: set[str] | None) -> None:
+    from . import server  # noqa: PLC0415
+
+    if not server.is_supported():
+        sys.stderr.write("serve requires Unix domain sockets\n")
+        sys.exit(1)
+    collector = server.Collector(
+        options.output_file or None,
+        options.merge,
+        baseline,
+        options.compression_level,
+        options.max_issues or None,
+        options.max_issues_per,
+    )
+    try:
+        server.serve(socket_path, collector, partial(_serve_request, collector=collector, options=options))
+    except (RuntimeError, OSError) as e:
+        sys.stderr.write(f"{e}\n")
+        sys.exit(1)
+    _write_stats(options, collector.written, collector.skipped)
+
+
+def _request_server(options: _Options, argv: list[str]) -> None:
+    from . import server  # noqa: PLC0415
+
+    request: dict[str, Any] = {"cwd": str(Path.cwd())}
+    body: Iterable[bytes] = ()
+    if argv in (["flush"], ["stop"]):
+        request["action"] = argv[0]
+    elif options.input_file:
+        request.update(action="input", linter=argv[0], path=str(Path(options.input_file).absolute()))
+    else:
+        request.update(action="run", commands=_split_commands(argv), echo=options.echo)
+        if not sys.stdin.isatty() and len(argv) == 1:
+            # send linter output from stdin, or run the command if stdin is empty
+            stdin = sys.stdin.buffer
+            read = stdin.read1 if hasattr(stdin, "read1") else stdin.read
+            first_chunk = read(capture.CHUNK_SIZE)
+            if first_chunk:
+                request = {"cwd": request["cwd"], "action": "parse", "linter": argv[0]}
+                body = chain([first_chunk], iter(partial(read, capture.CHUNK_SIZE), b""))
+
+    try:
+        response = server.request(options.server, request, body)
+    except OSError as e:
+        sys.stderr.write(f"Failed to connect to GitLab-CQ on {options.server}: {e}\n")
+        sys.exit(1)
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    if "error" in response:
+        sys.stderr.write(response["error"] + "\n")
+        sys.exit(1)
+
+
+def _merge(options: _Options, argv: list[str], baseline: set[str] | None) -> None:
+    from . import merge  # noqa: PLC0415
+
+    if len(argv) <= 1:
+        sys.stderr.write("No output and input report specified\n")
+        sys.exit(1)
+    output, *inputs = argv
+    missing = [path for path in inputs if not Path(path).is_file()]
+    if missing:
+        sys.stderr.write(f"Input report {', '.join(missing)} not found\n")
+        sys.exit(1)
+    try:
+        compress.check(compress.compression_of(output), options.compression_level)
+    except ValueError as e:
+        sys.stderr.write(f"{e}\n")
+        sys.exit(1)
+
+    with stats.get().phase("write"):
+        # sorted issues are deduplicated by the merge, without keeping their fingerprints
+        writer = report.open_writer(
+            output,
+            baseline=baseline,
+            level=options.compression_level,
+            limit=_make_limit(options),
+            dedup=not options.sort,
+        )
+        try:
+            with writer:
+                merge.merge(inputs, writer, options.sort)
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"Failed to merge reports: {e}\n")
+            sys.exit(1)
+    _write_stats(options, writer.count, writer.skipped)
+
+
+def _write_stats(options: _Options, written: int, skipped: int = 0) -> None:
+    recorded = stats.get()
+    if isinstance(recorded, stats.Stats):
+        recorded.written = written
+        recorded.skipped = skipped
+        recorded.write(options.stats or None)
 
 
 def main() -> None:
@@ -60,10 +675,28 @@ def main() -> None:
 Usage:
 
   Run linter command via. GitLab-CQ:
-    $ python -m gitlab_cq [--output file_path] [--merge] [--echo] CMD [Arguments]
+    $ python -m gitlab_cq [Options] CMD [Arguments]
+
+  Run linter commands in parallel via. GitLab-CQ:
+    $ python -m gitlab_cq [Options] CMD [Arguments] -- CMD [Arguments] ...
 
   Parse linter output from stdin:
-    $ CMD [Arguments] | python -m gitlab_cq [--output file_path] [--merge] [--echo] LINTER
+    $ CMD [Arguments] | python -m gitlab_cq [Options] LINTER
+
+  Parse linter output saved to a file:
+    $ python -m gitlab_cq [Options] --input file_path LINTER
+
+  Convert spool files (--output *.jsonl) to a report:
+    $ python -m gitlab_cq [--output file_path] finalize SPOOL [SPOOL ...]
+
+  Merge reports or spool files, e.g. of parallel jobs, into the report OUTPUT:
+    $ python -m gitlab_cq [--sort] [Options] merge OUTPUT REPORT [REPORT ...]
+
+  Collect issues of many calls in a daemon, written once on flush or stop:
+    $ python -m gitlab_cq [Options] serve SOCKET &
+    $ python -m gitlab_cq --server SOCKET [--echo] CMD [Arguments]
+    $ CMD [Arguments] | python -m gitlab_cq --server SOCKET LINTER
+    $ python -m gitlab_cq --server SOCKET {{flush,stop}}
 
 Arguments:
   CMD           Command to run linter
@@ -71,127 +704,178 @@ Arguments:
   LINTER        Linter name to parse: {{{linters}}}
 
 Options:
+  --input file_path     Parse linter output saved to file_path
+                            (gcc, clang and clang-tidy logs are memory-mapped)
   --output file_path    Output to file_path
-  --merge               Merge output to existing JSON file
+                            (JSON Lines spool if file_path ends with .jsonl,
+                            compressed if it ends with .gz or .zst, e.g. .json.gz)
+  --compression-level N Level of gzip (0-9, default: 6) or zstd (default: 3)
+  --sort                Sort merged issues by path and position (merge only)
+  --max-issues N        Output at most N issues, the most severe first, and an issue
+                            with the number of dropped issues
+  --max-issues-per {{{groups}}}
+                        Apply --max-issues to the issues of each check or file
+  --merge               Merge output to existing JSON file or append to spool
                             (available if --output is specified)
   --echo                Echo linter output
                             (available if --output is specified)
-""".format(linters=", ".join(SUPPORTED_LINTERS))
+  --parallel N          Run at most N linter commands at the same time
+                            (default: all commands)
+  --jobs N              Split ruff, mypy, pyright and clang-tidy commands by files
+                            and run N linter processes at the same time
+  --baseline file_path  Output only issues not found in the report file_path
+  --fingerprint SCHEME  Hash of issue fingerprints: {{{schemes}}}
+                            (default: md5, compatible with earlier versions)
+  --root directory      Report paths relative to directory
+                            (default: git repository root or current directory)
+  --count-duplicates    Add the number of occurrences to repeated gcc, clang and
+                            clang-tidy issues (issues are output once the output ends)
+  --stats[=file_path]   Output time per phase, input size, issue counts and peak
+                            memory as JSON to stderr (or file_path)
+  --parse-jobs N        Parse gcc, clang and clang-tidy output in N processes
+                            (for huge build logs; parsing starts once the output ends)
+  --server SOCKET       Send linter output or command to the daemon on SOCKET
+                            (only with --echo and --input, other options go to serve)
+  --changed-since REF   Run ruff, mypy, pyright and clang-tidy only on files changed
+                            since the git REF, reuse cached issues of other files
+  --compile-commands file_path
+                        Run clang-tidy on each translation unit of the compilation
+                            database file_path in parallel, reuse cached issues of
+                            unchanged units
+  --cache directory     Cache of issues for --changed-since and --compile-commands
+                            (default: .gitlab-cq-cache in the root directory)
+""".format(linters=", ".join(SUPPORTED_LINTERS), schemes=", ".join(FINGERPRINT_SCHEMES), groups=",".join(GROUPS))
         )
         sys.exit(1)
 
     # options
-    linter: _SUPPORTED_LINTERS
-    linter_output: str = ""
-    output_file, merge, echo = _parse_option_args(argv)
-    cmdline: str = ""
+    linter: Linter
+    options = _parse_option_args(argv)
+    echo = options.echo
+    issues: Iterable[AnyIssue] = ()
 
     if len(argv) == 0:
         sys.stderr.write("No linter name or command to run\n")
         sys.exit(1)
 
-    if not sys.stdin.isatty() and len(argv) == 1:
-        linter = argv[0]  # type: ignore
-        if linter not in SUPPORTED_LINTERS:
-            sys.stderr.write(f"Invalid linter name; {linter} is not supported\n")
-            sys.exit(1)
+    if options.server:
+        # leave parsing and writing to the daemon
+        _request_server(options, argv)
+        return
 
-        # read from stdin
-        def _tee(line: str) -> str:
-            if echo:
-                sys.stdout.write(line)
-            return line
+    try:
+        GitLabCodeQuality.set_fingerprint_scheme(options.fingerprint)
+    except ValueError as e:
+        sys.stderr.write(f"{e}\n")
+        sys.exit(1)
 
-        linter_output = "".join(_tee(line) for line in sys.stdin)
+    if options.root:
+        paths.set_root(options.root)
 
-    if not linter_output:
-        # run linter command
-        cmd = argv[0]
-        arguments = argv[1:]
-        cmdline = " ".join([cmd, *arguments])
+    if options.stats is not None:
+        stats.enable()
 
-        for name in SUPPORTED_LINTERS:
-            if name in cmd:
-                linter = name
-                break
-        else:
-            # fallback to equivalent linter
-            if "cmake" in cmd or "g++" in cmd:
-                linter = "gcc"
+    # fingerprints of known issues to leave out of the report
+    with stats.get().phase("baseline"):
+        baseline = report.load_fingerprints(options.baseline) if options.baseline else None
 
-            # linter not found
-            print(f"Invalid linter command; {cmd} is not supported")
+    if argv[0] == "serve":
+        if len(argv) == 1:
+            sys.stderr.write("No socket path specified\n")
             sys.exit(1)
+        _serve(options, argv[1], baseline)
+        return
 
-        # linter specific requirements in arguments
-        req: list[str] = []
-        if linter == "ruff":
-            req = ["--output-format", "json"]
-        elif linter == "pyright":
-            req = ["--outputjson"]
-        elif linter == "mypy":
-            req = ["--output=json"]
-        elif linter == "clang-tidy":
-            req = ["--quiet"]
-        if req and not any(arguments[i : i + len(req)] == req for i in range(len(arguments) - len(req) + 1)):
-            # check if the linter has a subcommand
-            if linter == "ruff":  # noqa: SIM108
-                arguments = arguments[:1] + req + arguments[1:]
-            else:
-                arguments = req + arguments
-
-        # run linter
-        with NamedTemporaryFile(mode="w", encoding="utf-8", buffering=1, delete=False) as writer:
-            proc = subprocess.Popen(  # noqa: S603
-                [cmd, *arguments], stdout=writer, stderr=subprocess.STDOUT, encoding="utf-8", shell=False
+    if argv[0] == "finalize":
+        # convert spool files to a report
+        if len(argv) == 1:
+            sys.stderr.write("No spool file specified\n")
+            sys.exit(1)
+        with stats.get().phase("write"):
+            written = report.finalize(
+                argv[1:], options.output_file or None, baseline, options.compression_level, _make_limit(options)
             )
-            write_path = Path(writer.name)
-            with write_path.open("r", encoding="utf-8", buffering=1) as reader:
-                while proc.poll() is None:
-                    linter_output += (c := reader.read())
-                    if echo:
-                        sys.stdout.write(c)
-                    time.sleep(0.1)
-
-                # close output file and read leftover
-                writer.close()
-                linter_output += (c := reader.read())
-                if echo:
-                    sys.stdout.write(c)
+        _write_stats(options, written)
+        return
 
-            # remove temporary file
-            write_path.unlink()
+    if argv[0] == "merge":
+        _merge(options, argv[1:], baseline)
+        return
 
-    # parse linter output
-    issues: list[GitLabCodeQuality.Issue]
-    try:
-        if linter == "ruff":
-            issues = parse_ruff(linter_output)
-        elif linter == "pyright":
-            issues = parse_pyright(linter_output)
-        elif linter == "mypy":
-            issues = parse_mypy(linter_output)
-        elif linter == "clang-tidy":
-            issues = parse_gcc(linter_output, linter, "minor")
-        elif linter in {"gcc", "clang"}:
-            issues = parse_gcc(linter_output, linter, "major")
+    if options.input_file:
+        linter = argv[0]  # type: ignore
+        if linter not in SUPPORTED_LINTERS or len(argv) > 1:
+            sys.stderr.write(f"Invalid linter name; {' '.join(argv)} is not supported with --input\n")
+            sys.exit(1)
+        if not Path(options.input_file).is_file():
+            sys.stderr.write(f"Input file {options.input_file} not found\n")
+            sys.exit(1)
+
+        issues = _parse_output(linter, _read_input_file(linter, options.input_file), options=options)
+
+    elif not sys.stdin.isatty() and len(argv) == 1:
+        linter = argv[0]  # type: ignore
+        if linter not in SUPPORTED_LINTERS:
+            sys.stderr.write(f"Invalid linter name; {linter} is not supported\n")
+            sys.exit(1)
+
+        # read from stdin
+        def _tee(chunks: Iterable[str]) -> Iterator[str]:
+            for chunk in chunks:
+                if echo:
+                    sys.stdout.write(chunk)
+                    sys.stdout.flush()
+                yield chunk
+
+        # fall back to running the command if stdin is empty
+        stdin_chunks = capture.read_chunks(sys.stdin.buffer)
+        first_chunk = next(stdin_chunks, "")
+        if first_chunk:
+            linter_output = _tee(chain([first_chunk], stdin_chunks))
+            issues = _parse_output(linter, linter_output, options=options)
+
+    if not issues:
+        # run linter commands
+        commands = _split_commands(argv)
+        try:
+            linters = _find_linters(commands)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+
+        if options.compile_commands:
+            if linters != ["clang-tidy"]:
+                sys.stderr.write("--compile-commands requires a single clang-tidy command\n")
+                sys.exit(1)
+            try:
+                issues = _run_compile_commands(commands[0], echo, options)
+            except (OSError, ValueError, KeyError) as e:
+                sys.stderr.write(f"Failed to read compilation database {options.compile_commands}: {e}\n")
+                sys.exit(1)
+        elif options.changed_since:
+            unsupported = sorted({linter for linter in linters if linter in {"gcc", "clang"}})
+            if unsupported:
+                sys.stderr.write(f"{', '.join(unsupported)} is not supported with --changed-since\n")
+                sys.exit(1)
+            try:
+                issues = _run_incremental(linters, commands, echo, options)
+            except ValueError as e:
+                sys.stderr.write(f"{e}\n")
+                sys.exit(1)
+        elif len(commands) == 1 and options.jobs == 1:
+            issues, _ = _run_linter(linters[0], commands[0], echo, options)
         else:
-            raise ValueError(f"linter {linter} is not supported")  # noqa: TRY301
-    except ValueError as e:
-        if cmdline:
-            raise RuntimeError(f"Failed to parse linter output with command: {cmdline}") from e
-        raise RuntimeError("Failed to parse linter output with std input") from e
-
-    # write to output file
-    if output_file:
-        output_path = Path(output_file)
-        if merge and output_path.exists() and output_path.stat().st_size > 0:
-            with output_path.open("r") as f:
-                issues = json.load(f) + issues
-        with output_path.open("w") as f:
-            json.dump(issues, f)
-    else:
-        print(json.dumps(issues))
+            issues = _run_linters(linters, commands, echo, options.parallel, options)
+
+    # write issues to the output file (or stdout) as they are parsed
+    with stats.get().phase("merge"):
+        writer = report.open_writer(
+            options.output_file or None, options.merge, baseline, options.compression_level, _make_limit(options)
+        )
+    with stats.get().phase("write"), writer:
+        writer.write_all(issues)
+
+    _write_stats(options, writer.count, writer.skipped)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+"""asyncio API to run linters and parse their output from an event loop, e.g. many linters at the same time.
+
+Usage:
+
+    issues = await gitlab_cq.run(["ruff", "check", "."])
+
+    async for issue in gitlab_cq.iter_issues(["pyright", "src"], cwd="project"):
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from asyncio.subprocess import DEVNULL, PIPE, STDOUT
+from typing import TYPE_CHECKING, Final
+
+from . import paths
+from .capture import CHUNK_SIZE, text_decoder
+from .linters import COMPILERS, add_required_arguments, find_linter, make_parser
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import AsyncIterator, Sequence
+    from contextlib import AbstractContextManager
+
+    from . import GitLabCodeQuality
+    from .linters import Linter
+    from .record import IssueRecord
+    from .stream import StreamParser
+
+
+class LinterError(RuntimeError):
+    """The output of a linter could not be parsed."""
+
+    def __init__(self, message: str, returncode: int | None, stderr: str) -> None:
+        super().__init__(message)
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+class _Parse:
+    # feed the parser without awaiting in between, paths are resolved relative to cwd of this call
+    def __init__(
+        self, linter: Linter, cwd: str | os.PathLike[str] | None, parse_jobs: int, count_duplicates: bool
+    ) -> None:
+        self.cwd = cwd
+        with self._working_directory():
+            self.parser: Final[StreamParser] = make_parser(linter, parse_jobs, count_duplicates)
+
+    def _working_directory(self) -> AbstractContextManager[object]:
+        return paths.working_directory(self.cwd) if self.cwd is not None else contextlib.nullcontext()
+
+    def __call__(self, chunk: str | None) -> list[IssueRecord]:
+        with self._working_directory():
+            return list(self.parser.feed(chunk) if chunk is not None else self.parser.close())
+
+
+async def _read(stream: asyncio.StreamReader) -> str:
+    decoder = text_decoder()
+    chunks = []
+    while chunk := await stream.read(CHUNK_SIZE):
+        chunks.append(decoder.decode(chunk))
+    chunks.append(decoder.decode(b"", final=True))
+    return "".join(chunks)
+
+
+async def iter_issues(
+    cmd: Sequence[str],
+    linter: Linter | None = None,
+    *,
+    cwd: str | os.PathLike[str] | None = None,
+    parse_jobs: int = 1,
+    count_duplicates: bool = False,
+) -> AsyncIterator[GitLabCodeQuality.Issue]:
+    """Run the linter command `cmd` and yield its issues while its output is parsed.
+
+    The arguments required to parse the output are added as by the CLI, and `linter` is found from the command if
+    not given. The exit code of the linter is not checked, since linters exit with an error when they report issues.
+    With `parse_jobs`, compiler output is parsed in that many processes once the linter exits, in a thread of the
+    default executor of the event loop.
+
+    Yields:
+        The issues in the order of the linter output.
+
+    Raises:
+        ValueError: if the linter is not supported.
+        LinterError: if the output cannot be parsed.
+    """
+    linter = linter or find_linter(cmd[0])
+    if linter is None:
+        raise ValueError(f"Invalid linter command; {cmd[0]} is not supported")
+    args = [cmd[0], *add_required_arguments(linter, list(cmd[1:]))]
+    parse = _Parse(linter, cwd, parse_jobs, count_duplicates)
+
+    proc = await asyncio.create_subprocess_exec(
+        *args, stdin=DEVNULL, stdout=PIPE, stderr=STDOUT if linter in COMPILERS else PIPE, cwd=cwd
+    )
+    assert proc.stdout is not None
+    # drain stderr concurrently so that neither pipe can fill up and block the linter
+    stderr = asyncio.ensure_future(_read(proc.stderr)) if proc.stderr is not None else None
+    decoder = text_decoder()
+    try:
+        try:
+            while chunk := await proc.stdout.read(CHUNK_SIZE):
+                for issue in parse(decoder.decode(chunk)):
+                    yield issue.issue
+            for issue in parse(decoder.decode(b"", final=True)):
+                yield issue.issue
+            # parallel parsers parse the collected output when closed, away from the event loop
+            closed = (
+                await asyncio.get_running_loop().run_in_executor(None, parse, None) if parse_jobs > 1 else parse(None)
+            )
+            for issue in closed:
+                yield issue.issue
+        except ValueError as e:
+            with contextlib.suppress(ProcessLookupError):
+                proc.kill()
+            returncode = await proc.wait()
+            message = "Failed to parse linter output with command: " + " ".join(args)
+            stderr_text = await stderr if stderr is not None else ""
+            if stderr_text:
+                message += "\nStderr:\n" + stderr_text
+            raise LinterError(message, returncode, stderr_text) from e
+        await proc.wait()
+    finally:
+        # stop the linter if the caller stopped iterating
+        if proc.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                proc.kill()
+            await proc.wait()
+        if stderr is not None and not stderr.done():
+            stderr.cancel()
+
+
+async def run(
+    cmd: Sequence[str],
+    linter: Linter | None = None,
+    *,
+    cwd: str | os.PathLike[str] | None = None,
+    parse_jobs: int = 1,
+    count_duplicates: bool = False,
+) -> list[GitLabCodeQuality.Issue]:
+    """Run the linter command `cmd` and return its issues, see `iter_issues`.
+
+    Returns:
+        The issues in the order of the linter output.
+    """
+    return [
+        issue
+        async for issue in iter_issues(cmd, linter, cwd=cwd, parse_jobs=parse_jobs, count_duplicates=count_duplicates)
+    ]
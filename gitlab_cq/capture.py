@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import codecs
+import io
+import sys
+import threading
+from typing import IO, TYPE_CHECKING, Final, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from typing_extensions import Self
+
+CHUNK_SIZE: Final[int] = 64 * 1024
+
+
+class CapturedOutput(NamedTuple):
+    returncode: int
+    stdout: str
+    stderr: str
+
+
+def text_decoder() -> io.IncrementalNewlineDecoder:
+    """Return a decoder of UTF-8 output read in chunks, translating newlines like text mode pipes.
+
+    Unlike text mode pipes, it returns the text of each chunk without waiting for the end of a line.
+    """
+    return io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(errors="replace"), translate=True)
+
+
+def read_chunks(stream: IO[bytes]) -> Iterator[str]:
+    decoder = text_decoder()
+    # read1 returns as soon as any data is available on the pipe
+    read = stream.read1 if hasattr(stream, "read1") else stream.read  # type: ignore
+    while chunk := read(CHUNK_SIZE):
+        if text := decoder.decode(chunk):
+            yield text
+    if text := decoder.decode(b"", final=True):
+        yield text
+
+
+class Capture:
+    def __init__(
+        self, args: list[str], *, merge_stderr: bool = False, echo: bool = False, cwd: str | None = None
+    ) -> None:
+        self.args: Final = args
+        self.echo: Final = echo
+        # characters read from stdout, a linter printing nothing may have failed
+        self.output_size = 0
+        self._stderr_chunks: list[str] = []
+        import subprocess  # noqa: PLC0415, S404
+
+        self._proc = subprocess.Popen(  # noqa: S603
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT if merge_stderr else subprocess.PIPE,
+            cwd=cwd,
+            shell=False,
+        )
+        self._stderr_thread: threading.Thread | None = None
+        if not merge_stderr:
+            # drain stderr concurrently so that neither pipe can fill up and block the linter
+            self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+            self._stderr_thread.start()
+
+    def _drain_stderr(self) -> None:
+        assert self._proc.stderr is not None
+        for chunk in read_chunks(self._proc.stderr):
+            self._stderr_chunks.append(chunk)
+            if self.echo:
+                sys.stderr.write(chunk)
+                sys.stderr.flush()
+
+    def __iter__(self) -> Iterator[str]:
+        # yield stdout chunks as soon as they arrive
+        assert self._proc.stdout is not None
+        for chunk in read_chunks(self._proc.stdout):
+            self.output_size += len(chunk)
+            if self.echo:
+                sys.stdout.write(chunk)
+                sys.stdout.flush()
+            yield chunk
+
+    def wait(self) -> int:
+        returncode = self._proc.wait()
+        if self._stderr_thread is not None:
+            self._stderr_thread.join()
+        return returncode
+
+    @property
+    def returncode(self) -> int | None:
+        return self._proc.returncode
+
+    @property
+    def stderr(self) -> str:
+        return "".join(self._stderr_chunks)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self.wait()
+        for stream in (self._proc.stdout, self._proc.stderr):
+            if stream is not None:
+                stream.close()
+
+
+def run(args: list[str], *, merge_stderr: bool = False, echo: bool = False, cwd: str | None = None) -> CapturedOutput:
+    with Capture(args, merge_stderr=merge_stderr, echo=echo, cwd=cwd) as capture:
+        # collect chunks and join once instead of repeated concatenation
+        stdout = "".join(capture)
+        returncode = capture.wait()
+        return CapturedOutput(returncode, stdout, capture.stderr)
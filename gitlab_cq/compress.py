@@ -0,0 +1,106 @@
+"""gzip and zstd compression of reports and spool files, chosen by the suffix of the output file (.gz, .zst).
+
+Compressed files are detected by their content when read, so any report or spool file can be compressed.
+Appending to a compressed spool file adds a gzip member or zstd frame, which are read as one stream.
+"""
+
+from __future__ import annotations
+
+import io
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    import os
+    from types import ModuleType
+
+SUFFIXES: Final[dict[str, str]] = {".gz": "gzip", ".zst": "zstd"}
+# faster than the maximum level of gzip, reports are compressed well anyway
+DEFAULT_LEVELS: Final[dict[str, int]] = {"gzip": 6, "zstd": 3}
+LEVELS: Final[dict[str, range]] = {"gzip": range(10), "zstd": range(-7, 23)}
+_MAGIC: Final[dict[bytes, str]] = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+
+
+def compression_of(path: str | os.PathLike[str]) -> str | None:
+    """Return the compression of the output file `path` from its suffix, or None if it is not compressed."""
+    return SUFFIXES.get(Path(path).suffix)
+
+
+def strip_suffix(path: str | os.PathLike[str]) -> Path:
+    path = Path(path)
+    return path.with_suffix("") if path.suffix in SUFFIXES else path
+
+
+def _zstandard() -> ModuleType:
+    try:
+        import zstandard  # noqa: PLC0415
+    except ImportError as e:
+        raise ValueError("zstd compression requires the zstandard package (pip install gitlab-cq[zstd])") from e
+    return zstandard
+
+
+def check(compression: str | None, level: int | None = None) -> None:
+    """Check that `compression` is available with `level`.
+
+    Raises:
+        ValueError: If `compression` is not available or `level` is out of its range.
+    """
+    if compression is None:
+        return
+    if compression == "zstd":
+        try:
+            from compression import zstd  # noqa: F401, PLC0415
+        except ImportError:
+            _zstandard()
+    if level is not None and level not in LEVELS[compression]:
+        levels = LEVELS[compression]
+        raise ValueError(f"Invalid compression level {level}; {compression} supports {levels[0]} to {levels[-1]}")
+
+
+def text_writer(raw: IO[bytes], compression: str | None, level: int | None = None) -> IO[str]:
+    """Return a text stream writing UTF-8 to `raw`, compressed with `compression`.
+
+    Closing the stream finishes the compressed data but may leave `raw` open.
+    """
+    stream: IO[bytes] | io.BufferedIOBase = raw
+    if compression == "gzip":
+        import gzip  # noqa: PLC0415
+
+        # no timestamp, so that the same issues give the same file
+        stream = gzip.GzipFile(
+            fileobj=raw, mode="wb", compresslevel=DEFAULT_LEVELS["gzip"] if level is None else level, mtime=0
+        )
+    elif compression == "zstd":
+        level = DEFAULT_LEVELS["zstd"] if level is None else level
+        try:
+            from compression import zstd  # noqa: PLC0415
+        except ImportError:
+            stream = _zstandard().ZstdCompressor(level=level).stream_writer(raw, closefd=False)
+        else:
+            stream = zstd.ZstdFile(raw, "wb", level=level)
+    return io.TextIOWrapper(stream, encoding="utf-8")  # type: ignore
+
+
+def open_text(path: str | os.PathLike[str]) -> IO[str]:
+    """Open the file `path` to read UTF-8 text, decompressed if it starts with a gzip or zstd header.
+
+    Returns:
+        The text stream, which the caller closes.
+    """
+    with Path(path).open("rb") as f:
+        head = f.read(4)
+    compression = next((name for magic, name in _MAGIC.items() if head.startswith(magic)), None)
+    if compression == "gzip":
+        import gzip  # noqa: PLC0415
+
+        # reads all members of appended spool files
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        try:
+            from compression import zstd  # noqa: PLC0415
+        except ImportError:
+            raw = Path(path).open("rb")  # noqa: SIM115
+            reader = _zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+            return io.TextIOWrapper(reader, encoding="utf-8")
+        return zstd.open(path, "rt", encoding="utf-8")
+    return Path(path).open("r", encoding="utf-8")
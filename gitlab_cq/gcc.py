@@ -1,42 +1,239 @@
 from __future__ import annotations
 
+import mmap
+import os
 import re
 import sys
 from pathlib import Path
-from typing import Final, Literal
+from typing import TYPE_CHECKING, Final, Literal
 
-from . import GitLabCodeQuality
+from . import GitLabCodeQuality, paths
+from .paths import get_resolver
+from .record import IssueRecord
+from .stream import BufferedParser, LineParser
 
-MESSAGE_REGEX: Final[re.Pattern[str]] = re.compile(
-    r"^(?P<path>.+):(?P<line>\d+):(?P<column>\d+): (?P<severity>\S+): (?P<message>.*?)( \[(?P<diagnostic>.*)\])?$"
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from . import FingerprintScheme
+
+# location and severity of a diagnostic, searched for instead of matching the whole line
+LOCATION_REGEX: Final[re.Pattern[str]] = re.compile(r":(?P<line>\d+):(?P<column>\d+): (?P<severity>\S+): ")
+
+# a line of the include chain printed before a diagnostic in a header
+INCLUDE_REGEX: Final[re.Pattern[str]] = re.compile(
+    r"(?:In file included from|\s+from) (?P<path>.+?):(?P<line>\d+)(?::\d+)?[:,]$"
 )
 
+# lines printed before a diagnostic about where it comes from
+CONTEXT_REGEX: Final[re.Pattern[str]] = re.compile(
+    r"In file included from |\s+from |.*: (In |At |required from|instantiated from)"
+)
 
-def parse(
-    linter_output: str, name: str, severity: Literal["info", "minor", "major", "critical", "blocker"]
-) -> list[GitLabCodeQuality.Issue]:
-    result: list[GitLabCodeQuality.Issue] = []
-    for line in linter_output.splitlines():
-        regex_result = MESSAGE_REGEX.match(line)
-        if regex_result is None or regex_result.group("severity") == "note":
-            continue
+# pieces per worker, so that workers finishing early pick up more work
+_PIECES_PER_JOB: Final[int] = 4
+
+# bytes of a memory-mapped log decoded at a time
+BLOCK_SIZE: Final[int] = 1024 * 1024
+
+
+class Parser(LineParser):
+    """Scan compiler output line by line.
+
+    An issue is completed by the next diagnostic or the end of the output: its notes are added as
+    `other_locations`, and the include chain printed before it as `trace`.
+    """
+
+    def __init__(self, name: str, severity: Literal["info", "minor", "major", "critical", "blocker"]) -> None:
+        super().__init__()
+        self.name: Final = name
+        self.severity: Final = severity
+        self._relative_path = get_resolver().resolve
+        self._issue: IssueRecord | None = None
+        self._trace: list[tuple[str, int]] = []
+
+    def parse_line(self, line: str) -> list[IssueRecord]:
+        # source snippets and carets, most of the output, start with a space
+        if line.startswith(("In file included from ", " ")):
+            include = INCLUDE_REGEX.match(line)
+            if include is not None:
+                # gcc prints one chain, clang a line per include; either way it ends with the next diagnostic
+                self._trace.append((self._relative_path(include.group("path")), int(include.group("line"))))
+            return []
+
+        location = LOCATION_REGEX.search(line)
+        if location is None or location.start() == 0:
+            return []
+        path = line[: location.start()]
+
+        if location.group("severity") == "note":
+            if self._issue is not None:
+                if self._issue.other_locations is None:
+                    self._issue.other_locations = []
+                self._issue.other_locations.append((self._relative_path(path), int(location.group("line"))))
+            self._trace = []
+            return []
+
+        # the next diagnostic completes the previous issue
+        issues = self._complete()
+        message = line[location.end() :]
+        diagnostic = None
+        if message.endswith("]"):
+            bracket = message.rfind(" [")
+            if bracket >= 0:
+                message, diagnostic = message[:bracket], message[bracket + 2 : -1]
+        self._issue = self.make_issue(path, location.group("line"), location.group("column"), message, diagnostic)
+        if self._issue is not None and self._trace:
+            self._issue.trace = self._trace
+        self._trace = []
+        return issues
+
+    def make_issue(self, path: str, line: str, column: str, message: str, diagnostic: str | None) -> IssueRecord | None:
         try:
-            issue: GitLabCodeQuality.Issue = {
-                "type": "issue",
-                "check_name": f"{name}: " + regex_result.group("diagnostic"),
-                "description": regex_result.group("message"),
-                "categories": ["Bug Risk"],
-                "location": {
-                    "path": str(Path(regex_result.group("path")).relative_to(Path.cwd())),
-                    "positions": {
-                        "begin": {"line": int(regex_result.group("line")), "column": int(regex_result.group("column"))},
-                        "end": {"line": int(regex_result.group("line")), "column": int(regex_result.group("column"))},
-                    },
-                },
-                "severity": severity,
-            }
-            GitLabCodeQuality.add_fingerprint(issue)
-            result.append(issue)
+            line_number = int(line)
+            column_number = int(column)
+            issue = IssueRecord(
+                f"{self.name}: " + diagnostic,  # type: ignore
+                message,
+                self._relative_path(path),
+                line_number,
+                column_number,
+                line_number,
+                column_number,
+                self.severity,
+                "Bug Risk",
+            )
+            issue.add_fingerprint()
         except Exception as e:  # noqa: BLE001
             print(f"Error: {e}", file=sys.stderr)
-    return result
+            return None
+        return issue
+
+    def _complete(self) -> list[IssueRecord]:
+        issue, self._issue = self._issue, None
+        return [issue] if issue is not None else []
+
+    def close(self) -> list[IssueRecord]:
+        issues = super().close()
+        issues.extend(self._complete())
+        return issues
+
+
+def _is_diagnostic(line: str) -> bool:
+    if line.startswith(" "):
+        return False
+    location = LOCATION_REGEX.search(line)
+    return location is not None and location.start() > 0 and location.group("severity") != "note"
+
+
+def _next_boundary(text: str, pos: int, start: int) -> int:
+    # the first line at or after pos that starts a diagnostic, moved back over its context lines
+    pos = text.find("\n", pos - 1) + 1
+    while 0 < pos < len(text):
+        end = text.find("\n", pos)
+        if _is_diagnostic(text[pos : end if end >= 0 else len(text)]):
+            break
+        pos = end + 1
+    else:
+        return -1
+    while pos > start + 1:
+        previous = text.rfind("\n", start, pos - 1) + 1
+        line = text[previous : pos - 1]
+        if previous <= start or LOCATION_REGEX.search(line) or not CONTEXT_REGEX.match(line):
+            break
+        pos = previous
+    return pos
+
+
+def split_output(text: str, count: int) -> list[str]:
+    """Split compiler output into at most `count` line-aligned pieces of similar size.
+
+    Each piece after the first starts with a diagnostic (or the context lines leading to it), so a diagnostic and
+    its notes are never split apart.
+
+    Returns:
+        The pieces in the order of `text`, which they concatenate to.
+    """
+    size = len(text) // count
+    pieces: list[str] = []
+    start = 0
+    while size and len(pieces) < count - 1:
+        pos = _next_boundary(text, start + size, start)
+        if pos < 0:
+            break
+        pieces.append(text[start:pos])
+        start = pos
+    pieces.append(text[start:])
+    return pieces
+
+
+def _init_worker(root: str, cwd: str, scheme: FingerprintScheme) -> None:
+    paths.set_root(root, cwd)
+    GitLabCodeQuality.set_fingerprint_scheme(scheme)
+
+
+def _parse_piece(
+    text: str, name: str, severity: Literal["info", "minor", "major", "critical", "blocker"]
+) -> list[IssueRecord]:
+    return list(Parser(name, severity).parse([text]))
+
+
+class ParallelParser(BufferedParser):
+    """Parse the whole output in pieces on a pool of `jobs` processes, for huge build logs.
+
+    Issues are returned in the order of the output, the same as `Parser`.
+    """
+
+    def __init__(
+        self, name: str, severity: Literal["info", "minor", "major", "critical", "blocker"], jobs: int
+    ) -> None:
+        super().__init__()
+        self.name: Final = name
+        self.severity: Final = severity
+        self.jobs: Final = jobs
+
+    def parse_text(self, text: str) -> Iterator[IssueRecord]:
+        pieces = split_output(text, self.jobs * _PIECES_PER_JOB)
+        if self.jobs <= 1 or len(pieces) == 1:
+            yield from _parse_piece(text, self.name, self.severity)
+            return
+        from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_worker,
+            initargs=(get_resolver().root, get_resolver().cwd, GitLabCodeQuality.fingerprint_scheme),
+        ) as executor:
+            # map keeps the order of the pieces
+            for issues in executor.map(_parse_piece, pieces, [self.name] * len(pieces), [self.severity] * len(pieces)):
+                yield from issues
+
+
+def read_file(path: str | os.PathLike[str]) -> Iterator[str]:
+    """Read a saved log through a memory map of it, decoding a block ending at a line break at a time.
+
+    Yields:
+        The decoded blocks of about `BLOCK_SIZE` characters, invalid UTF-8 replaced.
+    """
+    with Path(path).open("rb") as f:
+        # an empty file cannot be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            while start < len(mapped):
+                end = mapped.find(b"\n", start + BLOCK_SIZE) + 1 or len(mapped)
+                yield mapped[start:end].decode("utf-8", "replace")
+                start = end
+
+
+def iter_parse(
+    chunks: Iterable[str], name: str, severity: Literal["info", "minor", "major", "critical", "blocker"]
+) -> Iterator[GitLabCodeQuality.Issue]:
+    return (issue.issue for issue in Parser(name, severity).parse(chunks))
+
+
+def parse(
+    linter_output: str, name: str, severity: Literal["info", "minor", "major", "critical", "blocker"]
+) -> list[GitLabCodeQuality.Issue]:
+    return list(iter_parse([linter_output], name, severity))
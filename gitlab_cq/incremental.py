@@ -0,0 +1,214 @@
+"""Lint only the files changed since a git ref, reusing the issues cached for the other files (--changed-since)."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final
+
+from . import GitLabCodeQuality, capture, paths, report
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from .linters import Linter
+    from .record import AnyIssue
+
+CACHE_DIRECTORY: Final[str] = ".gitlab-cq-cache"
+CACHE_VERSION: Final[int] = 1
+
+# files each linter checks; clang-tidy checks translation units, not headers
+EXTENSIONS: Final[dict[str, tuple[str, ...]]] = {
+    "ruff": (".py", ".pyi"),
+    "mypy": (".py", ".pyi"),
+    "pyright": (".py", ".pyi"),
+    "clang-tidy": (".c", ".cc", ".cpp", ".cxx", ".c++", ".m", ".mm", ".cu"),
+}
+# linters checking the whole program: a change in one file can change the issues of any other file
+WHOLE_PROGRAM: Final[frozenset[str]] = frozenset({"mypy", "pyright"})
+# a changed header can change the issues of any translation unit
+HEADER_EXTENSIONS: Final[tuple[str, ...]] = (".h", ".hh", ".hpp", ".hxx", ".h++", ".inc", ".cuh")
+# options of each linter whose value may be an existing directory, which is not a file to lint; short options differ
+# between linters, e.g. -v is --verbose of ruff and mypy but --venvpath of pyright
+_DIRECTORY_OPTIONS: Final[dict[str, frozenset[str]]] = {
+    "ruff": frozenset({"--cache-dir", "--exclude", "--extend-exclude"}),
+    "mypy": frozenset({"--cache-dir", "--exclude", "--custom-typeshed-dir"}),
+    "pyright": frozenset({"-p", "--project", "-t", "--typeshedpath", "-v", "--venvpath"}),
+}
+
+
+def split_arguments(linter: str, arguments: list[str]) -> tuple[list[str], list[str]]:
+    """Split linter arguments into options and the files or directories to lint.
+
+    Paths are arguments naming an existing file with an extension of the linter, or an existing directory that is not
+    the value of an option like `--cache-dir` (clang-tidy only takes files).
+
+    Returns:
+        The options and the paths, each in the order of `arguments`.
+    """
+    extensions = EXTENSIONS[linter]
+    directory_options = _DIRECTORY_OPTIONS.get(linter, frozenset())
+    options: list[str] = []
+    scope: list[str] = []
+    for i, argument in enumerate(arguments):
+        option_value = i > 0 and (arguments[i - 1] in directory_options or arguments[i - 1].endswith("-report"))
+        if (argument.endswith(extensions) and Path(argument).is_file()) or (
+            linter != "clang-tidy" and not option_value and Path(argument).is_dir()
+        ):
+            scope.append(argument)
+        else:
+            options.append(argument)
+    return options, scope
+
+
+def _git(*args: str) -> list[str]:
+    result = capture.run(["git", *args])
+    if result.returncode:
+        raise ValueError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return [name for name in result.stdout.split("\0") if name]
+
+
+def list_files(scope: list[str], extensions: tuple[str, ...]) -> list[str]:
+    # tracked and untracked files, except ignored ones, relative to the current directory in a stable order
+    return sorted(
+        name for name in _git("ls-files", "-z", "-co", "--exclude-standard", "--", *scope) if name.endswith(extensions)
+    )
+
+
+def changed_files(ref: str, scope: list[str]) -> set[str]:
+    # the working tree compared to ref, relative to the current directory
+    return set(_git("diff", "-z", "--name-only", "--relative", ref, "--", *scope))
+
+
+def command_on_files(linter: str, cmd: str, options: list[str], files: list[str]) -> list[str]:
+    """Return the command running `cmd` with `options` on the explicitly given `files`.
+
+    ruff lints files given on the command line even if its configuration excludes them, unless `--force-exclude` is
+    set.
+    """
+    if linter == "ruff" and "--force-exclude" not in options and "--no-force-exclude" not in options:
+        options = [*options, "--force-exclude"]
+    return [cmd, *options, *files]
+
+
+def headers_changed(ref: str) -> bool:
+    # anywhere in the repository, headers are not in the scope of clang-tidy
+    return any(name.endswith(HEADER_EXTENSIONS) for name in _git("diff", "-z", "--name-only", ref, "--", ":/"))
+
+
+def data_hash(data: bytes) -> str:
+    """Return the hash of `data` used in cache files and their names."""
+    return GitLabCodeQuality.hasher("blake2b")(data).hexdigest()
+
+
+def file_hash(path: str | os.PathLike[str]) -> str:
+    return data_hash(Path(path).read_bytes())
+
+
+def write_cache(path: Path, data: dict[str, Any]) -> None:
+    """Write the cache file `path` atomically, so that concurrent runs never read a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        Path(temp_name).replace(path)
+    finally:
+        if Path(temp_name).exists():
+            Path(temp_name).unlink()
+
+
+def _path_of(issue: AnyIssue) -> str:
+    return issue["location"]["path"] if isinstance(issue, dict) else issue.path
+
+
+class Plan:
+    """Files of one linter command to lint again, and the cached issues of the others.
+
+    Issues of a file are reused while the hash of its content matches the cache. Files changed since `ref` are linted
+    without comparing hashes. Without a cache, the command runs unchanged and its issues are cached per file.
+    For mypy and pyright, and for clang-tidy when a header changed, any stale file makes the command run unchanged.
+    """
+
+    def __init__(self, linter: Linter, command: list[str], ref: str, cache_directory: str | os.PathLike[str]) -> None:
+        self.linter: Final = linter
+        self.full_command: Final = command
+        cmd, *arguments = command
+        options, scope = split_arguments(linter, arguments)
+        resolver = paths.get_resolver()
+        resolve = resolver.resolve
+        # one cache per command, the cached issues depend on all of these
+        key = json.dumps([
+            linter,
+            cmd,
+            options,
+            scope,
+            GitLabCodeQuality.fingerprint_scheme,
+            resolver.root,
+            resolver.cwd,
+        ])
+        self.cache_path: Final = Path(cache_directory) / f"{data_hash(key.encode())}.json"
+        cache = self._load()
+
+        changed = changed_files(ref, scope or ["."])
+        # content hash and cached issues by path relative to the root
+        self._files: dict[str, tuple[str, list[GitLabCodeQuality.Issue] | None]] = {}
+        stale: list[str] = []
+        for name in list_files(scope or ["."], EXTENSIONS[linter]):
+            path = resolve(name)
+            digest = file_hash(name)
+            cached = cache.get(path)
+            if name in changed or cached is None or cached[0] != digest:
+                stale.append(name)
+                self._files[path] = (digest, None)
+            else:
+                self._files[path] = (digest, cached[1])
+
+        whole = bool(stale) if linter in WHOLE_PROGRAM else linter == "clang-tidy" and headers_changed(ref)
+        if whole:
+            # the issues of unchanged files may change as well
+            stale = list(self._files)
+            self._files = {path: (digest, None) for path, (digest, _) in self._files.items()}
+
+        self.linted: Final = len(stale)
+        self.command: list[str] | None
+        if not cache or whole:
+            self.command = command
+        elif stale:
+            self.command = command_on_files(linter, cmd, options, stale)
+        else:
+            self.command = None
+        self._fresh: dict[str, list[GitLabCodeQuality.Issue]] = {}
+
+    def _load(self) -> dict[str, list]:
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION:
+            return {}
+        return data["files"]
+
+    def add(self, issues: Iterable[AnyIssue]) -> Iterator[AnyIssue]:
+        # keep the issues of linted files for the cache
+        for issue in issues:
+            path = _path_of(issue)
+            entry = self._files.get(path)
+            if entry is not None and entry[1] is None:
+                report.fingerprint_of(issue)
+                self._fresh.setdefault(path, []).append(issue if isinstance(issue, dict) else issue.issue)
+            yield issue
+
+    def cached(self) -> Iterator[GitLabCodeQuality.Issue]:
+        for _, issues in self._files.values():
+            if issues is not None:
+                yield from issues
+
+    def save(self) -> None:
+        files = {
+            path: [digest, self._fresh.get(path, []) if issues is None else issues]
+            for path, (digest, issues) in self._files.items()
+        }
+        write_cache(self.cache_path, {"version": CACHE_VERSION, "files": files})
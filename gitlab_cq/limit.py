@@ -0,0 +1,108 @@
+"""Keep only the most severe issues of a run, and the fingerprints of the dropped ones (--max-issues)."""
+
+from __future__ import annotations
+
+import heapq
+from operator import itemgetter
+from typing import TYPE_CHECKING, Final, Literal, Tuple, get_args
+
+from . import GitLabCodeQuality
+from .record import IssueRecord
+from .report import fingerprint_of
+
+if TYPE_CHECKING:
+    from typing_extensions import TypeAlias
+
+    from .record import AnyIssue
+
+Group = Literal["check", "file"]
+GROUPS: Final[tuple[Group, ...]] = get_args(Group)
+# most severe first
+SEVERITIES: Final[tuple[str, ...]] = ("blocker", "critical", "major", "minor", "info")
+SUMMARY_CHECK: Final[str] = "gitlab-cq: max-issues"
+
+_RANK: Final[dict[str, int]] = {severity: rank for rank, severity in enumerate(SEVERITIES)}
+# (-rank, -order, fingerprint, issue); the top of a heap is the least severe issue, the latest of equal ones
+_Entry: TypeAlias = Tuple[int, int, str, "AnyIssue"]
+
+
+def _severity(issue: AnyIssue) -> str:
+    return issue.severity if isinstance(issue, IssueRecord) else issue.get("severity", "info")
+
+
+def _group(issue: AnyIssue, group: Group) -> str:
+    if group == "check":
+        return issue.check_name if isinstance(issue, IssueRecord) else issue["check_name"]
+    return issue.path if isinstance(issue, IssueRecord) else issue["location"]["path"]
+
+
+class IssueLimit:
+    """Keep at most `max_issues` issues, or that many per check or file with `group`.
+
+    More severe issues replace less severe ones, and the first of equally severe issues are kept. Issues are
+    deduplicated by fingerprint, also duplicates of dropped issues, so that they are not counted as dropped again.
+    Earlier summaries, e.g. of a merged report, are left out.
+    """
+
+    def __init__(self, max_issues: int, group: Group | None = None) -> None:
+        if max_issues < 1:
+            raise ValueError("max_issues must be positive")
+        self.max_issues: Final = max_issues
+        self.group: Final = group
+        self.skipped = 0
+        # dropped issues by severity
+        self.dropped: dict[str, int] = {}
+        self._heaps: dict[str, list[_Entry]] = {}
+        self._kept: set[str] = set()
+        self._dropped: set[str] = set()
+        self._order = 0
+
+    def add(self, issue: AnyIssue) -> None:
+        check_name = issue.check_name if isinstance(issue, IssueRecord) else issue["check_name"]
+        if check_name == SUMMARY_CHECK:
+            return
+        fingerprint = fingerprint_of(issue)
+        if fingerprint in self._kept or fingerprint in self._dropped:
+            self.skipped += 1
+            return
+        severity = _severity(issue)
+        entry: _Entry = (-_RANK.get(severity, len(SEVERITIES)), -self._order, fingerprint, issue)
+        self._order += 1
+        heap = self._heaps.setdefault(_group(issue, self.group) if self.group else "", [])
+        if len(heap) < self.max_issues:
+            heapq.heappush(heap, entry)
+            self._kept.add(fingerprint)
+            return
+        if entry[:2] > heap[0][:2]:
+            self._kept.add(fingerprint)
+            entry = heapq.heapreplace(heap, entry)
+            self._kept.discard(entry[2])
+            severity = _severity(entry[3])
+        self._dropped.add(entry[2])
+        self.dropped[severity] = self.dropped.get(severity, 0) + 1
+
+    def issues(self) -> list[AnyIssue]:
+        """Return the kept issues in the order they were added."""
+        entries = [entry for heap in self._heaps.values() for entry in heap]
+        entries.sort(key=itemgetter(1), reverse=True)
+        return [entry[3] for entry in entries]
+
+    def summary(self) -> GitLabCodeQuality.Issue | None:
+        """Return an issue reporting the number of dropped issues, or None if no issue was dropped."""
+        total = sum(self.dropped.values())
+        if not total:
+            return None
+        counts = ", ".join(
+            f"{self.dropped[severity]} {severity}" for severity in SEVERITIES if severity in self.dropped
+        )
+        limit = f"{self.max_issues} per {self.group}" if self.group else str(self.max_issues)
+        return {
+            "type": "issue",
+            "check_name": SUMMARY_CHECK,
+            "description": f"{total} more issues are not reported, the report is limited to {limit} ({counts})",
+            "categories": ["Style"],
+            "location": {"path": ".", "lines": {"begin": 1, "end": 1}},
+            "severity": "info",
+            # the same for every run, so that a changing count is not reported as a new issue
+            "fingerprint": GitLabCodeQuality.hasher()(SUMMARY_CHECK.encode()).hexdigest(),
+        }
@@ -0,0 +1,98 @@
+"""Supported linters: how their commands are recognized, the arguments they require, and their parsers."""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Final, Literal, get_args
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+    from .stream import StreamParser
+
+Linter = Literal["ruff", "pyright", "mypy", "gcc", "clang-tidy", "clang"]
+SUPPORTED_LINTERS: Final[tuple[Linter, ...]] = get_args(Linter)
+# linters printing compiler diagnostics, on stderr
+COMPILERS: Final[frozenset[str]] = frozenset({"gcc", "clang", "clang-tidy"})
+# linters always printing a JSON document, also without issues
+_JSON_OUTPUT: Final[frozenset[str]] = frozenset({"ruff", "pyright"})
+# exit code from which ruff, mypy and pyright failed instead of reporting issues
+_FAILURE_EXIT_CODE: Final[int] = 2
+
+# module parsing the output of each linter, imported only for the linters used
+_PARSER_MODULES: Final[dict[str, str]] = {
+    "ruff": "ruff",
+    "pyright": "pyright",
+    "mypy": "mypy",
+    "gcc": "gcc",
+    "clang-tidy": "gcc",
+    "clang": "gcc",
+}
+
+
+def parser_module(linter: str) -> ModuleType:
+    if linter not in _PARSER_MODULES:
+        raise ValueError(f"linter {linter} is not supported")
+    return importlib.import_module("." + _PARSER_MODULES[linter], __package__)
+
+
+def make_parser(linter: str, parse_jobs: int = 1, count_duplicates: bool = False) -> StreamParser:
+    module = parser_module(linter)
+    if linter in COMPILERS:
+        from .stream import DedupParser  # noqa: PLC0415
+
+        severity: Literal["minor", "major"] = "minor" if linter == "clang-tidy" else "major"
+        parser: StreamParser
+        if parse_jobs > 1:
+            parser = module.ParallelParser(linter, severity, parse_jobs)
+        else:
+            parser = module.Parser(linter, severity)
+        # headers are compiled once per translation unit, drop repeated warnings early
+        return DedupParser(parser, count=count_duplicates)
+    return module.Parser()
+
+
+def failed(linter: str, returncode: int | None, output: bool) -> bool:
+    """Return True if the exit code of a linter means that it failed, not that it reported issues.
+
+    ruff, mypy and pyright exit with 1 when they report issues and with 2 or more when they fail. Compilers and
+    clang-tidy exit with an error for error diagnostics, so they failed only if they printed nothing.
+    """
+    if returncode is None or returncode < 0:
+        # killed by a signal
+        return True
+    if linter in COMPILERS:
+        return returncode != 0 and not output
+    return returncode >= _FAILURE_EXIT_CODE or (not output and linter in _JSON_OUTPUT)
+
+
+def find_linter(cmd: str) -> Linter | None:
+    for name in SUPPORTED_LINTERS:
+        if name in cmd:
+            return name
+
+    # fallback to equivalent linter
+    if "cmake" in cmd or "g++" in cmd:
+        return "gcc"
+
+    return None
+
+
+def add_required_arguments(linter: Linter, arguments: list[str]) -> list[str]:
+    # linter specific requirements in arguments
+    req: list[str] = []
+    if linter == "ruff":
+        req = ["--output-format", "json"]
+    elif linter == "pyright":
+        req = ["--outputjson"]
+    elif linter == "mypy":
+        req = ["--output=json"]
+    elif linter == "clang-tidy":
+        req = ["--quiet"]
+    if req and not any(arguments[i : i + len(req)] == req for i in range(len(arguments) - len(req) + 1)):
+        # check if the linter has a subcommand
+        if linter == "ruff":  # noqa: SIM108
+            arguments = arguments[:1] + req + arguments[1:]
+        else:
+            arguments = req + arguments
+    return arguments
@@ -0,0 +1,104 @@
+"""Merge the reports of parallel jobs into one report while streaming them (`gitlab-cq merge`).
+
+With sorting, issues are sorted by path and position with an external merge sort: sorted runs of issues are
+written to temporary files and merged k-way, so duplicates are adjacent and memory does not grow with the reports.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import tempfile
+from itertools import chain
+from pathlib import Path
+from typing import TYPE_CHECKING, Final, Tuple
+
+from .report import fingerprint_of, iter_issues, read_spool
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+    from typing_extensions import TypeAlias
+
+    from . import GitLabCodeQuality
+    from .report import ReportWriter, SpoolWriter
+
+# issues sorted in memory at a time
+RUN_SIZE: Final[int] = 20000
+# runs merged at a time, to keep the number of open files low
+FAN_IN: Final[int] = 64
+
+SortKey: TypeAlias = Tuple[str, int, int, str]
+
+
+def sort_key(issue: GitLabCodeQuality.Issue) -> SortKey:
+    """Return the path, line and column of `issue`, with its fingerprint to order equal positions."""
+    location = issue["location"]
+    positions = location.get("positions")
+    if positions is not None:
+        begin = positions["begin"]  # type: ignore
+        line, column = begin["line"], begin["column"]
+    else:
+        line, column = location["lines"]["begin"], 0  # type: ignore
+    return location["path"], line, column, fingerprint_of(issue)
+
+
+def _write_run(issues: Iterable[GitLabCodeQuality.Issue], directory: str) -> str:
+    fd, name = tempfile.mkstemp(suffix=".jsonl", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(issue) + "\n" for issue in issues)
+    return name
+
+
+def _merge_runs(runs: list[str]) -> Iterator[GitLabCodeQuality.Issue]:
+    return heapq.merge(*(read_spool(run) for run in runs), key=sort_key)
+
+
+def sort_issues(
+    issues: Iterable[GitLabCodeQuality.Issue], directory: str, run_size: int = RUN_SIZE
+) -> Iterator[GitLabCodeQuality.Issue]:
+    """Yield `issues` ordered by `sort_key`, holding at most `run_size` issues and a run of `directory` in memory."""
+    runs: list[str] = []
+    batch: list[GitLabCodeQuality.Issue] = []
+    for issue in issues:
+        batch.append(issue)
+        if len(batch) >= run_size:
+            batch.sort(key=sort_key)
+            runs.append(_write_run(batch, directory))
+            batch = []
+    batch.sort(key=sort_key)
+    if not runs:
+        yield from batch
+        return
+    if batch:
+        runs.append(_write_run(batch, directory))
+    del batch
+    while len(runs) > FAN_IN:
+        merged = [_write_run(_merge_runs(runs[i : i + FAN_IN]), directory) for i in range(0, len(runs), FAN_IN)]
+        for run in runs:
+            Path(run).unlink()
+        runs = merged
+    yield from _merge_runs(runs)
+
+
+def merge(paths: Sequence[str | os.PathLike[str]], writer: ReportWriter | SpoolWriter, sort: bool = False) -> None:
+    """Write the issues of the reports or spool files `paths` to `writer`, reading them one issue at a time.
+
+    With `sort`, the issues are sorted with temporary files and duplicates are dropped here, so `writer` can be
+    opened without `dedup` to keep no fingerprints in memory.
+    """
+    issues = chain.from_iterable(iter_issues(path) for path in paths)
+    if not sort:
+        writer.write_all(issues)
+        return
+    with tempfile.TemporaryDirectory(prefix="gitlab-cq-merge-") as directory:
+        last = None
+        for issue in sort_issues(issues, directory):
+            # issues with the same fingerprint have the same position, and are ordered by fingerprint
+            fingerprint = fingerprint_of(issue)
+            if fingerprint == last:
+                writer.skipped += 1
+                continue
+            last = fingerprint
+            writer.write(issue)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import json
-from itertools import dropwhile
-from pathlib import Path
-from typing import Literal, TypedDict
+from typing import TYPE_CHECKING, Literal, TypedDict
 
-from . import GitLabCodeQuality
+from .paths import get_resolver
+from .record import IssueRecord
+from .stream import LineParser
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from . import GitLabCodeQuality
 
 
 class _MypyOutputJson(TypedDict):
@@ -18,37 +23,50 @@ class _MypyOutputJson(TypedDict):
     severity: Literal["error", "note"]
 
 
-def parse(linter_output: str) -> list[GitLabCodeQuality.Issue]:
-    gitlab_code_quality: list[GitLabCodeQuality.Issue] = []
-    try:
-        for line in dropwhile(lambda line: not line.startswith("{"), linter_output.splitlines()):
-            # skip empty lines
-            if not line:
-                continue
+class Parser(LineParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self._started = False
+        self._relative_path = get_resolver().resolve
 
+    def parse_line(self, line: str) -> list[IssueRecord]:
+        # skip leading lines until the JSON lines start
+        if not self._started:
+            if not line.startswith("{"):
+                return []
+            self._started = True
+
+        # skip empty lines
+        if not line:
+            return []
+
+        try:
             obj: _MypyOutputJson = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(e.msg + "\nHint: argument `--output=json` is required\nOutput:\n" + line) from e
+
+        # skip notes
+        if obj["severity"] == "note":
+            return []
 
-            # skip notes
-            if obj["severity"] == "note":
-                continue
-
-            issue: GitLabCodeQuality.Issue = {
-                "type": "issue",
-                "check_name": "mypy: " + obj["code"],
-                "description": obj["message"],
-                "categories": ["Style"],
-                "location": {
-                    "path": str(Path(obj["file"])),
-                    "positions": {
-                        "begin": {"line": obj["line"], "column": obj["column"]},
-                        "end": {"line": obj["line"], "column": obj["column"]},
-                    },
-                },
-                "severity": "minor",
-            }
-            GitLabCodeQuality.add_fingerprint(issue)
-            gitlab_code_quality.append(issue)
-    except json.JSONDecodeError as e:
-        raise ValueError(e.msg + "\nHint: argument `--output=json` is required\nOutput:\n" + linter_output) from e
-
-    return gitlab_code_quality
+        issue = IssueRecord(
+            "mypy: " + obj["code"],
+            obj["message"],
+            self._relative_path(obj["file"]),
+            obj["line"],
+            obj["column"],
+            obj["line"],
+            obj["column"],
+            "minor",
+            "Style",
+        )
+        issue.add_fingerprint()
+        return [issue]
+
+
+def iter_parse(chunks: Iterable[str]) -> Iterator[GitLabCodeQuality.Issue]:
+    return (issue.issue for issue in Parser().parse(chunks))
+
+
+def parse(linter_output: str) -> list[GitLabCodeQuality.Issue]:
+    return list(iter_parse([linter_output]))
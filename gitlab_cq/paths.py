@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+CACHE_SIZE: Final[int] = 4096
+
+
+def find_project_root(start: str | os.PathLike[str] | None = None) -> Path:
+    # the closest directory with .git (a directory, or a file for worktrees and submodules)
+    start = Path(start) if start is not None else Path.cwd()
+    for directory in (start, *start.parents):
+        if (directory / ".git").exists():
+            return directory
+    return start
+
+
+class PathResolver:
+    """Convert paths reported by linters to paths relative to the project root.
+
+    Relative paths are relative to `cwd` (default: the current directory). Results are cached per raw path string.
+    Paths outside of the root are returned as normalized absolute paths.
+    """
+
+    def __init__(
+        self,
+        root: str | os.PathLike[str] | None = None,
+        cache_size: int = CACHE_SIZE,
+        cwd: str | os.PathLike[str] | None = None,
+    ) -> None:
+        self.cwd: Final = os.path.normpath(Path(cwd).absolute()) if cwd is not None else str(Path.cwd())
+        self.root: Final = os.path.normpath(Path(self.cwd, root)) if root else str(find_project_root(self.cwd))
+        self._root_prefix = self.root if self.root.endswith(os.sep) else self.root + os.sep
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _resolve(self, raw: str) -> str:
+        # absolute paths replace cwd
+        path = os.path.normpath(Path(self.cwd, raw))
+        if path.startswith(self._root_prefix):
+            return path[len(self._root_prefix) :]
+        if path == self.root:
+            return "."
+        return path
+
+    def __call__(self, raw: str) -> str:
+        return self.resolve(raw)
+
+
+_resolver: PathResolver | None = None
+# resolvers of other working directories, see working_directory
+_resolvers: dict[str, PathResolver] = {}
+_resolvers_lock: Final = threading.Lock()
+_local: Final = threading.local()
+
+
+def set_root(root: str | os.PathLike[str] | None, cwd: str | os.PathLike[str] | None = None) -> None:
+    global _resolver  # noqa: PLW0603
+    _resolver = PathResolver(root, cwd=cwd)
+    _resolvers.clear()
+
+
+def get_resolver() -> PathResolver:
+    global _resolver  # noqa: PLW0603
+    resolver: PathResolver | None = getattr(_local, "resolver", None)
+    if resolver is not None:
+        return resolver
+    if _resolver is None:
+        _resolver = PathResolver()
+    return _resolver
+
+
+@contextmanager
+def working_directory(cwd: str | os.PathLike[str]) -> Generator[PathResolver, None, None]:
+    """Resolve paths relative to `cwd` instead of the current directory in this thread, keeping the root.
+
+    Yields:
+        The resolver of `cwd`, shared by all threads using the same directory.
+    """
+    root = get_resolver().root
+    cwd = os.path.normpath(Path(cwd).absolute())
+    with _resolvers_lock:
+        resolver = _resolvers.get(cwd)
+        if resolver is None:
+            resolver = _resolvers[cwd] = PathResolver(root, cwd=cwd)
+    previous = getattr(_local, "resolver", None)
+    _local.resolver = resolver
+    try:
+        yield resolver
+    finally:
+        _local.resolver = previous
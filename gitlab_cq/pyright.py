@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 import json
-import re
-from pathlib import Path
-from typing import Literal, TypedDict
+from typing import TYPE_CHECKING, Final, Literal, TypedDict
 
-from . import GitLabCodeQuality
+from .paths import get_resolver
+from .record import IssueRecord
+from .stream import BufferedParser, decode_json, find_json_body
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from . import GitLabCodeQuality
+
+_HINT: Final[str] = "Hint: argument `--outputjson` is required"
 
 
 class _LineCharacter(TypedDict):
@@ -41,42 +48,45 @@ class _PyrightOutputJson(TypedDict):
     summary: _Summary
 
 
-def parse(linter_output: str) -> list[GitLabCodeQuality.Issue]:
-    # extract JSON body
-    match = re.search(r"(^{.*|(?<=\n){.*)$", linter_output, re.DOTALL)
-    if not match:
-        raise ValueError(
-            "No JSON body found in the output\n" "Hint: argument `--outputjson` is required\nOutput:\n" + linter_output
-        )
-
-    gitlab_code_quality: list[GitLabCodeQuality.Issue] = []
-    try:
-        pyright_output_json: _PyrightOutputJson = json.loads(match.group(0))
+class Parser(BufferedParser):
+    def parse_text(self, linter_output: str) -> Iterator[IssueRecord]:  # noqa: PLR6301
+        relative_path = get_resolver().resolve
+
+        # locate JSON body
+        pos = find_json_body(linter_output, "{", "}")
+        if pos < 0:
+            raise ValueError("No JSON body found in the output\n" + _HINT + "\nOutput:\n" + linter_output)
+
+        try:
+            # decode in place, ignoring anything after the JSON body
+            pyright_output_json: _PyrightOutputJson = decode_json(linter_output, pos)
+        except json.JSONDecodeError as e:
+            raise ValueError(e.msg + "\n" + _HINT + "\nOutput:\n" + linter_output) from e
+
         for obj in pyright_output_json["generalDiagnostics"]:
-            issue: GitLabCodeQuality.Issue = {
-                "type": "issue",
-                "check_name": "Pyright: " + obj["rule"],
-                "description": obj["message"],
-                "content": {
-                    "body": "["
-                    + obj["rule"]
-                    + "](https://github.com/microsoft/pyright/blob/main/docs/configuration.md#"
-                    + obj["rule"]
-                    + ")"
-                },
-                "categories": ["Style"],
-                "location": {
-                    "path": str(Path(obj["file"]).relative_to(Path.cwd())),
-                    "positions": {
-                        "begin": {"line": obj["range"]["start"]["line"], "column": obj["range"]["start"]["character"]},
-                        "end": {"line": obj["range"]["end"]["line"], "column": obj["range"]["end"]["character"]},
-                    },
-                },
-                "severity": "minor",
-            }
-            GitLabCodeQuality.add_fingerprint(issue)
-            gitlab_code_quality.append(issue)
-    except json.JSONDecodeError as e:
-        raise ValueError(e.msg + "\nHint: argument `--outputjson` is required\nOutput:\n" + linter_output) from e
-
-    return gitlab_code_quality
+            issue = IssueRecord(
+                "Pyright: " + obj["rule"],
+                obj["message"],
+                relative_path(obj["file"]),
+                obj["range"]["start"]["line"],
+                obj["range"]["start"]["character"],
+                obj["range"]["end"]["line"],
+                obj["range"]["end"]["character"],
+                "minor",
+                "Style",
+                "["
+                + obj["rule"]
+                + "](https://github.com/microsoft/pyright/blob/main/docs/configuration.md#"
+                + obj["rule"]
+                + ")",
+            )
+            issue.add_fingerprint()
+            yield issue
+
+
+def iter_parse(chunks: Iterable[str]) -> Iterator[GitLabCodeQuality.Issue]:
+    return (issue.issue for issue in Parser().parse(chunks))
+
+
+def parse(linter_output: str) -> list[GitLabCodeQuality.Issue]:
+    return list(iter_parse([linter_output]))
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import sys
+from json.encoder import encode_basestring_ascii
+from typing import TYPE_CHECKING, Literal, Union
+
+from . import GitLabCodeQuality
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from typing_extensions import TypeAlias
+
+    from . import FingerprintScheme
+
+_Category = Literal[
+    "Bug Risk", "Clarity", "Compatibility", "Complexity", "Duplication", "Performance", "Security", "Style"
+]
+_Severity = Literal["info", "minor", "major", "critical", "blocker"]
+
+_intern = sys.intern
+
+
+class IssueRecord:
+    """Compact issue with a single category and a begin/end position, as produced by the parsers.
+
+    Repeated strings are interned. Use `issue` for the equivalent `GitLabCodeQuality.Issue`.
+    """
+
+    __slots__ = (
+        "begin_column",
+        "begin_line",
+        "body",
+        "category",
+        "check_name",
+        "description",
+        "end_column",
+        "end_line",
+        "fingerprint",
+        "other_locations",
+        "path",
+        "severity",
+        "trace",
+    )
+
+    def __init__(
+        self,
+        check_name: str,
+        description: str,
+        path: str,
+        begin_line: int,
+        begin_column: int,
+        end_line: int,
+        end_column: int,
+        severity: _Severity,
+        category: _Category,
+        body: str | None = None,
+    ) -> None:
+        self.check_name = _intern(check_name)
+        self.description = description
+        self.path = _intern(path)
+        self.begin_line = begin_line
+        self.begin_column = begin_column
+        self.end_line = end_line
+        self.end_column = end_column
+        self.severity = severity
+        self.category = category
+        self.body = _intern(body) if body is not None else None
+        self.fingerprint: str | None = None
+        # (path, line) of related locations, e.g. notes of a compiler diagnostic
+        self.other_locations: list[tuple[str, int]] | None = None
+        # (path, line) of the locations leading to the issue, e.g. the include chain of a header
+        self.trace: list[tuple[str, int]] | None = None
+
+    def fingerprint_data(self) -> bytes:
+        # same as GitLabCodeQuality.fingerprint_data for the materialized issue
+        return (
+            f"{self.check_name}{self.description}{self.path}"
+            f"{self.begin_line}{self.begin_column}{self.end_line}{self.end_column}"
+        ).encode()
+
+    def add_fingerprint(self, scheme: FingerprintScheme | None = None) -> None:
+        self.fingerprint = GitLabCodeQuality.hasher(scheme)(self.fingerprint_data()).hexdigest()
+
+    @property
+    def issue(self) -> GitLabCodeQuality.Issue:
+        # same key order as the parsers used to build
+        issue: dict[str, object] = {"type": "issue", "check_name": self.check_name, "description": self.description}
+        if self.body is not None:
+            issue["content"] = {"body": self.body}
+        issue["categories"] = [self.category]
+        issue["location"] = {
+            "path": self.path,
+            "positions": {
+                "begin": {"line": self.begin_line, "column": self.begin_column},
+                "end": {"line": self.end_line, "column": self.end_column},
+            },
+        }
+        if self.trace is not None:
+            issue["trace"] = {"locations": _locations(self.trace)}
+        if self.other_locations is not None:
+            issue["other_locations"] = _locations(self.other_locations)
+        issue["severity"] = self.severity
+        if self.fingerprint is not None:
+            issue["fingerprint"] = self.fingerprint
+        return issue  # type: ignore
+
+    def to_json(self) -> str:
+        # same output as json.dumps(self.issue) without building the dicts
+        return "".join((
+            '{"type": "issue", "check_name": ',
+            encode_basestring_ascii(self.check_name),
+            ', "description": ',
+            encode_basestring_ascii(self.description),
+            "" if self.body is None else ', "content": {"body": ' + encode_basestring_ascii(self.body) + "}",
+            ', "categories": [',
+            encode_basestring_ascii(self.category),
+            '], "location": {"path": ',
+            encode_basestring_ascii(self.path),
+            (
+                f', "positions": {{"begin": {{"line": {self.begin_line}, "column": {self.begin_column}}}, '
+                f'"end": {{"line": {self.end_line}, "column": {self.end_column}}}}}}}'
+            ),
+            "" if self.trace is None else ', "trace": {"locations": ' + _locations_json(self.trace) + "}",
+            "" if self.other_locations is None else ', "other_locations": ' + _locations_json(self.other_locations),
+            ', "severity": ',
+            encode_basestring_ascii(self.severity),
+            "" if self.fingerprint is None else ', "fingerprint": ' + encode_basestring_ascii(self.fingerprint),
+            "}",
+        ))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IssueRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None  # type: ignore
+
+    def __reduce__(self) -> tuple[object, ...]:
+        # positional fields are cheaper to pickle than the slot state, and strings are interned again on load
+        return (
+            _restore,
+            (
+                self.check_name,
+                self.description,
+                self.path,
+                self.begin_line,
+                self.begin_column,
+                self.end_line,
+                self.end_column,
+                self.severity,
+                self.category,
+                self.body,
+                self.fingerprint,
+                self.other_locations,
+                self.trace,
+            ),
+        )
+
+    def __repr__(self) -> str:
+        return f"IssueRecord({self.issue!r})"
+
+
+def _restore(
+    check_name: str,
+    description: str,
+    path: str,
+    begin_line: int,
+    begin_column: int,
+    end_line: int,
+    end_column: int,
+    severity: _Severity,
+    category: _Category,
+    body: str | None,
+    fingerprint: str | None,
+    other_locations: list[tuple[str, int]] | None,
+    trace: list[tuple[str, int]] | None,
+) -> IssueRecord:
+    record = IssueRecord(
+        check_name, description, path, begin_line, begin_column, end_line, end_column, severity, category, body
+    )
+    record.fingerprint = fingerprint
+    record.other_locations = other_locations
+    record.trace = trace
+    return record
+
+
+def _locations(locations: list[tuple[str, int]]) -> list[GitLabCodeQuality.Location | GitLabCodeQuality.Location2]:
+    return [{"path": path, "lines": {"begin": line, "end": line}} for path, line in locations]
+
+
+def _locations_json(locations: list[tuple[str, int]]) -> str:
+    return (
+        "["
+        + ", ".join(
+            f'{{"path": {encode_basestring_ascii(path)}, "lines": {{"begin": {line}, "end": {line}}}}}'
+            for path, line in locations
+        )
+        + "]"
+    )
+
+
+AnyIssue: TypeAlias = Union[GitLabCodeQuality.Issue, IssueRecord]
+
+
+def as_issue(issue: AnyIssue) -> GitLabCodeQuality.Issue:
+    return issue.issue if isinstance(issue, IssueRecord) else issue
+
+
+def as_issues(issues: Iterable[AnyIssue]) -> list[GitLabCodeQuality.Issue]:
+    return [as_issue(issue) for issue in issues]
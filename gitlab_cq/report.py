@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Final
+
+from . import GitLabCodeQuality, compress
+from .record import IssueRecord
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from types import TracebackType
+    from typing import Any
+
+    from typing_extensions import Self
+
+    from .limit import IssueLimit
+    from .record import AnyIssue
+
+SPOOL_SUFFIX: Final[str] = ".jsonl"
+# characters read at a time by iter_report
+READ_SIZE: Final[int] = 1 << 16
+
+_WHITESPACE: Final[re.Pattern[str]] = re.compile(r"[ \t\n\r]*")
+
+
+def is_spool(path: str | os.PathLike[str]) -> bool:
+    return compress.strip_suffix(path).suffix == SPOOL_SUFFIX
+
+
+def _iter_array(f: IO[str]) -> Iterator[Any]:
+    # decode the items of a JSON array one by one, holding a chunk of the text and the item being decoded
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def read() -> None:
+        nonlocal buffer, pos, eof
+        chunk = f.read(READ_SIZE)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    expected = "["
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()  # type: ignore
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            read()
+            continue
+        char = buffer[pos]
+        if expected == "[" or (expected == "," and char != "]"):
+            if char != expected:
+                raise ValueError(f"Expecting '{expected}': {buffer[pos : pos + 20]!r}")
+            expected = "item or ]" if expected == "[" else "item"
+            pos += 1
+        elif char == "]" and expected != "item":
+            return
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # the item continues in the next chunk
+                read()
+                continue
+            if end == len(buffer) and not eof and not isinstance(item, (dict, list)):
+                # a number may continue in the next chunk
+                read()
+                continue
+            yield item
+            pos = end
+            expected = ","
+
+
+def iter_report(path: str | os.PathLike[str]) -> Iterator[GitLabCodeQuality.Issue]:
+    """Yield the issues of the report `path` while reading it, in memory independent of the size of the report."""
+    path = Path(path)
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with compress.open_text(path) as f:
+        yield from _iter_array(f)
+
+
+def read_spool(path: str | os.PathLike[str]) -> Iterator[GitLabCodeQuality.Issue]:
+    path = Path(path)
+    if not path.exists():
+        return
+    with compress.open_text(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.endswith("\n"):
+                # the last append was interrupted
+                sys.stderr.write(f"Warning: ignore incomplete line {line_number} in {path}\n")
+                return
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_issues(path: str | os.PathLike[str]) -> Iterator[GitLabCodeQuality.Issue]:
+    if is_spool(path):
+        return read_spool(path)
+    return iter_report(path)
+
+
+def _dumps(issue: AnyIssue) -> str:
+    return issue.to_json() if isinstance(issue, IssueRecord) else json.dumps(issue)
+
+
+def fingerprint_of(issue: AnyIssue) -> str:
+    if isinstance(issue, IssueRecord):
+        if issue.fingerprint is None:
+            issue.add_fingerprint()
+        return issue.fingerprint  # type: ignore
+    if "fingerprint" not in issue:
+        GitLabCodeQuality.add_fingerprint(issue)
+    return issue["fingerprint"]
+
+
+def load_fingerprints(path: str | os.PathLike[str]) -> set[str]:
+    return {fingerprint_of(issue) for issue in iter_issues(path)}
+
+
+class _Writer(ABC):
+    def __init__(
+        self,
+        path: str | os.PathLike[str] | None = None,
+        dedup: bool = True,
+        baseline: set[str] | None = None,
+        level: int | None = None,
+        limit: IssueLimit | None = None,
+    ) -> None:
+        self.path = Path(path) if path is not None else None
+        self.count = 0
+        self.skipped = 0
+        # fingerprints already written, GitLab expects them to be unique in a report; a limit dedups what it keeps
+        self._seen: set[str] | None = set() if dedup and limit is None else None
+        self._baseline = baseline
+        self._limit = limit
+        self._temp_path: Path | None = None
+        self._file: IO[str]
+        self._raw: IO[bytes] | None = None
+        if self.path is None:
+            self._file = sys.stdout
+        else:
+            fd, temp_name = tempfile.mkstemp(prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent)
+            self._temp_path = Path(temp_name)
+            self._raw = os.fdopen(fd, "wb")
+            # compressed while written if path ends with .gz or .zst
+            self._file = compress.text_writer(self._raw, compress.compression_of(self.path), level)
+
+    def _accept(self, issue: AnyIssue) -> bool:
+        if self._seen is None and not self._baseline:
+            return True
+        fingerprint = fingerprint_of(issue)
+        if self._baseline and fingerprint in self._baseline:
+            self.skipped += 1
+            return False
+        if self._seen is not None:
+            if fingerprint in self._seen:
+                self.skipped += 1
+                return False
+            self._seen.add(fingerprint)
+        return True
+
+    def write(self, issue: AnyIssue) -> None:
+        if not self._accept(issue):
+            return
+        if self._limit is None:
+            self._write(issue)
+        else:
+            # written when the writer is closed
+            self._limit.add(issue)
+
+    @abstractmethod
+    def _write(self, issue: AnyIssue) -> None: ...
+
+    def _finish(self) -> None:
+        if self._limit is None:
+            return
+        limit, self._limit = self._limit, None
+        for issue in limit.issues():
+            self._write(issue)
+        summary = limit.summary()
+        if summary is not None:
+            self._write(summary)
+        self.skipped += limit.skipped
+
+    def write_all(self, issues: Iterable[AnyIssue]) -> None:
+        for issue in issues:
+            self.write(issue)
+
+    def _commit(self, path: Path, temp_path: Path) -> None:  # noqa: PLR6301
+        # mkstemp creates the file with 0o600, apply the usual permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        temp_path.chmod(0o666 & ~umask)
+        temp_path.replace(path)
+
+    def _close_file(self) -> None:
+        try:
+            self._file.close()
+        finally:
+            assert self._raw is not None
+            self._raw.close()
+
+    def close(self) -> None:
+        self._finish()
+        if self._temp_path is None:
+            self._file.flush()
+            return
+        self._close_file()
+        assert self.path is not None
+        try:
+            self._commit(self.path, self._temp_path)
+        finally:
+            if self._temp_path.exists():
+                self._temp_path.unlink()
+
+    def abort(self) -> None:
+        if self._temp_path is None:
+            self._file.flush()
+            return
+        self._close_file()
+        self._temp_path.unlink()
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ReportWriter(_Writer):
+    """Write issues to a GitLab Code Quality report one by one.
+
+    The report is written to a temporary file next to `path` and renamed over `path` when the writer is closed
+    without an error, so an interrupted run never leaves a truncated report. Without `path`, it is written to stdout.
+    Issues with a fingerprint already written (`dedup`) or found in `baseline` are dropped.
+    A `path` ending with .gz or .zst is compressed with gzip or zstd at `level`.
+    With `limit`, only the issues kept by it are written, followed by a summary of the dropped issues.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str] | None = None,
+        dedup: bool = True,
+        baseline: set[str] | None = None,
+        level: int | None = None,
+        limit: IssueLimit | None = None,
+    ) -> None:
+        super().__init__(path, dedup, baseline, level, limit)
+        self._file.write("[")
+
+    def _write(self, issue: AnyIssue) -> None:
+        # same layout as json.dump(issues, f)
+        if self.count:
+            self._file.write(", ")
+        self._file.write(_dumps(issue))
+        self.count += 1
+
+    def close(self) -> None:
+        self._finish()
+        self._file.write("]\n" if self._temp_path is None else "]")
+        super().close()
+
+    def __enter__(self) -> Self:
+        return self
+
+
+class SpoolWriter(_Writer):
+    """Write issues as JSON Lines, which can be appended to cheaply and converted to a report with `finalize`.
+
+    With `append`, the new lines are added to the end of `path` once the writer is closed without an error.
+    Duplicates of issues appended by earlier runs are only dropped by `finalize`.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        append: bool = False,
+        dedup: bool = True,
+        baseline: set[str] | None = None,
+        level: int | None = None,
+        limit: IssueLimit | None = None,
+    ) -> None:
+        super().__init__(path, dedup, baseline, level, limit)
+        self.append: Final = append
+
+    def _write(self, issue: AnyIssue) -> None:
+        self._file.write(_dumps(issue) + "\n")
+        self.count += 1
+
+    def _commit(self, path: Path, temp_path: Path) -> None:
+        if not self.append or not path.exists():
+            super()._commit(path, temp_path)
+            return
+        with temp_path.open("rb") as src, path.open("ab") as dst:
+            shutil.copyfileobj(src, dst)
+
+    def __enter__(self) -> Self:
+        return self
+
+
+def open_writer(
+    path: str | os.PathLike[str] | None,
+    merge: bool = False,
+    baseline: set[str] | None = None,
+    level: int | None = None,
+    limit: IssueLimit | None = None,
+    dedup: bool = True,
+) -> ReportWriter | SpoolWriter:
+    if path is not None and is_spool(path):
+        return SpoolWriter(path, append=merge, dedup=dedup, baseline=baseline, level=level, limit=limit)
+    writer = ReportWriter(path, dedup=dedup, baseline=baseline, level=level, limit=limit)
+    if merge and path is not None:
+        try:
+            writer.write_all(iter_report(path))
+        except BaseException:
+            writer.abort()
+            raise
+    return writer
+
+
+def finalize(
+    spool_paths: Iterable[str | os.PathLike[str]],
+    path: str | os.PathLike[str] | None = None,
+    baseline: set[str] | None = None,
+    level: int | None = None,
+    limit: IssueLimit | None = None,
+) -> int:
+    with ReportWriter(path, baseline=baseline, level=level, limit=limit) as writer:
+        for spool_path in spool_paths:
+            writer.write_all(iter_issues(spool_path))
+        return writer.count
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import json
-import re
-from pathlib import Path
-from typing import TypedDict
+from typing import TYPE_CHECKING, TypedDict
 
-from . import GitLabCodeQuality
+from .paths import get_resolver
+from .record import IssueRecord
+from .stream import BufferedParser, find_json_body, iter_json_array
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from . import GitLabCodeQuality
 
 
 class _LocationOrEndLocation(TypedDict):
@@ -37,39 +42,45 @@ class _RuffOutputJson(TypedDict):
     url: str
 
 
+class Parser(BufferedParser):
+    def parse_text(self, linter_output: str) -> Iterator[IssueRecord]:  # noqa: PLR6301
+        relative_path = get_resolver().resolve
+
+        # locate JSON body
+        pos = find_json_body(linter_output, "[", "]")
+        if pos < 0:
+            raise ValueError(
+                "No JSON body found in the output\n"
+                "Hint: argument `--output-format json` is required and do not set `--output`\nOutput:\n" + linter_output
+            )
+
+        # decode items one by one in place
+        ruff_output_json: Iterator[_RuffOutputJson] = iter_json_array(linter_output, pos)
+        try:
+            for obj in ruff_output_json:
+                issue = IssueRecord(
+                    "Ruff: " + obj["code"],
+                    obj["message"],
+                    relative_path(obj["filename"]),
+                    obj["location"]["row"],
+                    obj["location"]["column"],
+                    obj["end_location"]["row"],
+                    obj["end_location"]["column"],
+                    "minor",
+                    "Style",
+                    "[" + obj["code"] + "](" + obj["url"] + ")",
+                )
+                issue.add_fingerprint()
+                yield issue
+        except json.JSONDecodeError as e:
+            raise ValueError(
+                "Hint: argument `--output-format json` is required and do not set `--output`\nOutput:\n" + linter_output
+            ) from e
+
+
+def iter_parse(chunks: Iterable[str]) -> Iterator[GitLabCodeQuality.Issue]:
+    return (issue.issue for issue in Parser().parse(chunks))
+
+
 def parse(linter_output: str) -> list[GitLabCodeQuality.Issue]:
-    # extract JSON body
-    match = re.search(r"(^\[.*|(?<=\n)\[.*)$", linter_output, re.DOTALL)
-    if not match:
-        raise ValueError(
-            "No JSON body found in the output\n"
-            "Hint: argument `--output-format json` is required and do not set `--output`\nOutput:\n" + linter_output
-        )
-
-    gitlab_code_quality: list[GitLabCodeQuality.Issue] = []
-    try:
-        ruff_output_json: list[_RuffOutputJson] = json.loads(match.group())
-        for obj in ruff_output_json:
-            issue: GitLabCodeQuality.Issue = {
-                "type": "issue",
-                "check_name": "Ruff: " + obj["code"],
-                "description": obj["message"],
-                "content": {"body": "[" + obj["code"] + "](" + obj["url"] + ")"},
-                "categories": ["Style"],
-                "location": {
-                    "path": str(Path(obj["filename"]).relative_to(Path.cwd())),
-                    "positions": {
-                        "begin": {"line": obj["location"]["row"], "column": obj["location"]["column"]},
-                        "end": {"line": obj["end_location"]["row"], "column": obj["end_location"]["column"]},
-                    },
-                },
-                "severity": "minor",
-            }
-            GitLabCodeQuality.add_fingerprint(issue)
-            gitlab_code_quality.append(issue)
-    except json.JSONDecodeError as e:
-        raise ValueError(
-            "Hint: argument `--output-format json` is required and do not set `--output`\nOutput:\n" + linter_output
-        ) from e
-
-    return gitlab_code_quality
+    return list(iter_parse([linter_output]))
@@ -0,0 +1,206 @@
+"""Daemon collecting the issues of many GitLab-CQ calls on a Unix domain socket (`gitlab-cq serve`).
+
+A request is a JSON object on one line, followed by linter output for "parse" requests, and is answered with a
+JSON object on one line.
+"""
+
+from __future__ import annotations
+
+import json
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Final
+
+from . import report
+from .limit import IssueLimit
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from .limit import Group
+    from .record import IssueRecord
+
+# seconds a client waits for the daemon to create the socket, e.g. when both are started in the same job
+CONNECT_TIMEOUT: Final[float] = 10.0
+_CONNECT_INTERVAL: Final[float] = 0.05
+
+
+class Collector:
+    """Issues accumulated over the requests to a daemon, written to `path` on `flush`.
+
+    Issues are deduplicated as they come. After the first flush, later flushes merge into what was written.
+    """
+
+    def __init__(
+        self,
+        path: str | None,
+        merge: bool = False,
+        baseline: set[str] | None = None,
+        level: int | None = None,
+        max_issues: int | None = None,
+        group: Group | None = None,
+    ) -> None:
+        self.path: Final = path
+        self.merge = merge
+        self.baseline: Final = baseline
+        self.level: Final = level
+        self.max_issues: Final = max_issues
+        self.group: Final = group
+        self.written = 0
+        self.skipped = 0
+        self._issues: list[IssueRecord] = []
+        self._seen: set[str] = set()
+        self._lock = threading.Lock()
+
+    def add(self, issues: Iterable[IssueRecord]) -> int:
+        count = 0
+        with self._lock:
+            for issue in issues:
+                fingerprint = report.fingerprint_of(issue)
+                if fingerprint in self._seen:
+                    self.skipped += 1
+                    continue
+                self._seen.add(fingerprint)
+                self._issues.append(issue)
+                count += 1
+        return count
+
+    def flush(self) -> int:
+        with self._lock:
+            limit = IssueLimit(self.max_issues, self.group) if self.max_issues else None
+            with report.open_writer(self.path, self.merge, self.baseline, self.level, limit) as writer:
+                writer.write_all(self._issues)
+            self._issues = []
+            # keep the issues written so far
+            self.merge = self.path is not None
+            self.written += writer.count
+            self.skipped += writer.skipped
+            return writer.count
+
+
+class _Requests:
+    # number of requests being handled, so that stopping can wait for them
+    def __init__(self) -> None:
+        self.active = 0
+        self.condition = threading.Condition()
+
+    def __enter__(self) -> None:
+        with self.condition:
+            self.active += 1
+
+    def __exit__(self, *_: object) -> None:
+        with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def wait_others(self) -> None:
+        with self.condition:
+            self.condition.wait_for(lambda: self.active <= 1)
+
+
+def _send(stream: IO[bytes], response: dict[str, Any]) -> None:
+    stream.write(json.dumps(response).encode() + b"\n")
+    stream.flush()
+
+
+def serve(path: str, collector: Collector, handle: Callable[[dict[str, Any], IO[bytes]], dict[str, Any]]) -> None:
+    """Handle requests on the socket `path` until a "stop" request, then write the pending issues.
+
+    Requests of several clients are handled in parallel. `handle` is called for requests other than "flush" and
+    "stop" with the request and the rest of the input, and returns the response.
+
+    Raises:
+        RuntimeError: if GitLab-CQ is already serving on `path`.
+    """
+    import socketserver  # noqa: PLC0415
+
+    requests = _Requests()
+
+    def respond(body: IO[bytes]) -> dict[str, Any]:
+        request = json.loads(body.readline())
+        action = request.get("action")
+        if action == "flush":
+            return {"written": collector.flush()}
+        if action == "stop":
+            # no new requests, and the ones already accepted are added before writing
+            threading.Thread(target=server.shutdown).start()
+            requests.wait_others()
+            return {"written": collector.flush()}
+        return handle(request, body)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            with requests:
+                try:
+                    response = respond(self.rfile)  # type: ignore
+                except Exception as e:  # noqa: BLE001
+                    response = {"error": str(e) or type(e).__name__}
+                _send(self.wfile, response)  # type: ignore
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if Path(path).exists():
+        if _is_listening(path):
+            raise RuntimeError(f"GitLab-CQ is already serving on {path}")
+        # left behind by a daemon that was killed
+        Path(path).unlink()
+    server = Server(path, Handler)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        Path(path).unlink()
+
+
+def _is_listening(path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+        return True
+
+
+def _connect(path: str, timeout: float) -> socket.socket:
+    deadline = time.monotonic() + timeout
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            sock.close()
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(_CONNECT_INTERVAL)
+        else:
+            return sock
+
+
+def request(
+    path: str, request: dict[str, Any], body: Iterable[bytes] = (), timeout: float = CONNECT_TIMEOUT
+) -> dict[str, Any]:
+    """Send `request`, followed by the chunks of `body`, to the daemon on `path` and return its response.
+
+    Returns:
+        The response of the daemon, with "error" if the request failed there.
+
+    Raises:
+        RuntimeError: if the daemon closed the connection without a response.
+    """
+    with _connect(path, timeout) as sock, sock.makefile("rb") as reader:
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        for chunk in body:
+            sock.sendall(chunk)
+        sock.shutdown(socket.SHUT_WR)
+        line = reader.readline()
+    if not line:
+        raise RuntimeError(f"GitLab-CQ on {path} closed the connection")
+    return json.loads(line)
+
+
+def is_supported() -> bool:
+    return hasattr(socket, "AF_UNIX") and sys.platform != "win32"
@@ -0,0 +1,206 @@
+"""Split one linter command into commands on parts of its files, to run them in parallel (--jobs)."""
+
+from __future__ import annotations
+
+import configparser
+import json
+import os
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final
+
+from .incremental import EXTENSIONS, command_on_files, list_files, split_arguments
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# more shards than jobs, so that jobs finishing early take over the remaining shards
+SHARDS_PER_JOB: Final[int] = 4
+# configuration files of mypy, in the order mypy reads them
+MYPY_CONFIG_FILES: Final[tuple[str, ...]] = ("mypy.ini", ".mypy.ini", "pyproject.toml", "setup.cfg")
+# excluded by pyright unless its configuration sets exclude
+PYRIGHT_DEFAULT_EXCLUDE: Final[tuple[str, ...]] = ("**/node_modules", "**/__pycache__", "**/.*")
+
+
+def _walk(scope: list[str], extensions: tuple[str, ...]) -> list[str]:
+    # outside of a git repository; hidden directories like .venv are skipped
+    files: list[str] = []
+    for path in scope:
+        if Path(path).is_file():
+            files.append(path)
+            continue
+        for directory, directories, names in os.walk(path):
+            directories[:] = [name for name in directories if not name.startswith(".")]
+            files.extend(os.path.normpath(Path(directory, name)) for name in names if name.endswith(extensions))
+    return sorted(files)
+
+
+def expand_files(scope: list[str], extensions: tuple[str, ...]) -> list[str]:
+    try:
+        return list_files(scope, extensions)
+    except (OSError, ValueError):
+        return _walk(scope, extensions)
+
+
+def _option_value(options: list[str], *names: str) -> str | None:
+    for i, option in enumerate(options):
+        if option in names and i + 1 < len(options):
+            return options[i + 1]
+        name, _, value = option.partition("=")
+        if value and name in names:
+            return value
+    return None
+
+
+def _read_toml(path: Path) -> dict[str, Any]:
+    try:
+        import tomllib  # noqa: PLC0415
+    except ImportError:
+        # raises ImportError if missing, then the configuration is unknown
+        import tomli as tomllib  # type: ignore  # noqa: PLC0415
+    with path.open("rb") as f:
+        return tomllib.load(f)
+
+
+def _split_list(value: str | list[str]) -> list[str]:
+    # comma separated in INI files
+    values = value.split(",") if isinstance(value, str) else value
+    return [item.strip() for item in values if item.strip()]
+
+
+def _mypy_config(options: list[str]) -> tuple[list[str], list[str]]:
+    # files and exclude regular expressions of the mypy configuration
+    config_file = _option_value(options, "--config-file")
+    for name in [config_file] if config_file else MYPY_CONFIG_FILES:
+        path = Path(name)
+        if not path.is_file():
+            continue
+        if path.suffix == ".toml":
+            section = _read_toml(path).get("tool", {}).get("mypy")
+            if section is None and config_file is None:
+                continue
+            section = section or {}
+            exclude = section.get("exclude", [])
+            return _split_list(section.get("files", [])), [exclude] if isinstance(exclude, str) else exclude
+        parser = configparser.ConfigParser()
+        parser.read(path, encoding="utf-8")
+        if not parser.has_section("mypy"):
+            if path.name == "setup.cfg" and config_file is None:
+                continue
+            return [], []
+        # one regular expression, usually in verbose mode over several lines
+        exclude = parser.get("mypy", "exclude", fallback="")
+        return _split_list(parser.get("mypy", "files", fallback="")), [exclude] if exclude else []
+    return [], []
+
+
+def _pyright_config(options: list[str]) -> tuple[Path, list[str], list[str]]:
+    # directory, include and exclude patterns of the pyright configuration
+    project = _option_value(options, "-p", "--project")
+    path = Path(project or ".")
+    if path.is_dir():
+        path = next((path / name for name in ("pyrightconfig.json", "pyproject.toml") if (path / name).is_file()), path)
+    section: dict[str, Any] = {}
+    if path.suffix == ".json":
+        # comments and trailing commas are not supported here, such a file is reported as unreadable
+        section = json.loads(path.read_text(encoding="utf-8"))
+    elif path.suffix == ".toml":
+        section = _read_toml(path).get("tool", {}).get("pyright", {})
+    directory = path if path.is_dir() else path.parent
+    return directory, section.get("include", []), section.get("exclude", list(PYRIGHT_DEFAULT_EXCLUDE))
+
+
+def _glob_regex(pattern: str) -> str:
+    # a pyright path pattern: ** matches any directories, * and ? characters of one path component
+    parts = []
+    for part in Path(pattern.replace("\\", "/")).as_posix().strip("/").split("/"):
+        if part == "**":
+            parts.append("(?:[^/]+/)*")
+        elif part != ".":
+            parts.append(re.escape(part).replace(r"\*", "[^/]*").replace(r"\?", "[^/]") + "/")
+    # also excludes everything below a matching directory
+    return "^" + "".join(parts).rstrip("/") + "(?:/|$)"
+
+
+def _configured_files(linter: str, options: list[str]) -> tuple[list[str], Callable[[str], bool]]:
+    """Return the files or directories a linter checks by default, and whether its configuration excludes a file.
+
+    Files given on the command line are checked by mypy and pyright even if their configuration excludes them, so
+    the configured `exclude` are applied here instead.
+
+    Raises:
+        ValueError: if an exclude of mypy is not a valid regular expression.
+    """
+    if linter == "mypy":
+        files, exclude = _mypy_config(options)
+        # --exclude on the command line replaces the configuration
+        arguments = [options[i + 1] for i, option in enumerate(options[:-1]) if option == "--exclude"]
+        arguments += [option.split("=", 1)[1] for option in options if option.startswith("--exclude=")]
+        try:
+            regexes = [re.compile(regex) for regex in arguments or exclude]
+        except re.error as e:
+            raise ValueError(e) from None
+
+        def mypy_excluded(name: str) -> bool:
+            # mypy matches the relative paths of the directories it walks and of the files, with a slash
+            parts = Path(name).parts
+            paths = ["/".join(parts[:i]) + "/" for i in range(1, len(parts))] + ["/".join(parts)]
+            return any(regex.search(path) for regex in regexes for path in paths)
+
+        return files, mypy_excluded
+    if linter == "pyright":
+        directory, include, exclude = _pyright_config(options)
+        patterns = [
+            re.compile(_glob_regex(os.path.relpath(pattern, directory) if Path(pattern).is_absolute() else pattern))
+            for pattern in exclude
+        ]
+
+        def pyright_excluded(name: str) -> bool:
+            path = Path(os.path.relpath(Path(name).resolve(), directory.resolve())).as_posix()
+            return any(pattern.match(path) for pattern in patterns)
+
+        return [os.path.relpath(directory / name) for name in include], pyright_excluded
+    return [], lambda _: False
+
+
+def partition(files: list[str], count: int, size: Callable[[str], int] = os.path.getsize) -> list[list[str]]:
+    """Split `files` into at most `count` runs of consecutive files with about the same total size.
+
+    Returns:
+        The runs, in the order of `files`.
+    """
+    sizes = [max(size(name), 1) for name in files]
+    total = sum(sizes)
+    shards: list[list[str]] = [[]]
+    done = 0
+    for name, file_size in zip(files, sizes):
+        # start the next shard if most of the file is beyond the share of the current one
+        if shards[-1] and len(shards) < count and done + file_size / 2 > total * len(shards) / count:
+            shards.append([])
+        shards[-1].append(name)
+        done += file_size
+    return shards
+
+
+def shard_command(linter: str, command: list[str], jobs: int) -> list[list[str]]:
+    """Return commands running `command` on consecutive parts of its files, in the order of the files.
+
+    The files and directories in the arguments (default: the current directory, or the configured files of mypy and
+    pyright) are expanded with `git ls-files`, or by walking the directories outside of a git repository. Files
+    excluded by the configuration of the linter are left out.
+
+    Returns:
+        The commands, or only `command` if it has at most one file or the configuration cannot be read.
+    """
+    if linter not in EXTENSIONS or jobs <= 1:
+        return [command]
+    cmd, *arguments = command
+    options, scope = split_arguments(linter, arguments)
+    try:
+        configured, excluded = _configured_files(linter, options)
+    except (ImportError, OSError, ValueError):
+        return [command]
+    files = [name for name in expand_files(scope or configured or ["."], EXTENSIONS[linter]) if not excluded(name)]
+    if len(files) <= 1:
+        return [command]
+    return [command_on_files(linter, cmd, options, shard) for shard in partition(files, jobs * SHARDS_PER_JOB)]
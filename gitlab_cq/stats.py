@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final
+
+from . import GitLabCodeQuality, _hashers
+from .__version__ import __version__
+from .stream import StreamParser
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from contextlib import AbstractContextManager
+    from types import TracebackType
+
+    from .record import IssueRecord
+
+PHASES: Final[tuple[str, ...]] = ("baseline", "capture", "parse", "fingerprint", "linters", "merge", "write", "other")
+
+
+class NullStats:
+    """Statistics that are not recorded, the default so that instrumented code costs close to nothing."""
+
+    enabled: Final = False
+
+    def phase(self, name: str) -> AbstractContextManager[object]:  # noqa: ARG002, PLR6301
+        return _null_context
+
+    def chunks(self, chunks: Iterable[str]) -> Iterable[str]:  # noqa: PLR6301
+        return chunks
+
+    def parser(self, parser: StreamParser, linter: str) -> StreamParser:  # noqa: ARG002, PLR6301
+        return parser
+
+
+_null_context: Final = nullcontext()
+
+
+class _Phase:
+    def __init__(self, stats: Stats, name: str) -> None:
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.stats.enter(self.name)
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        self.stats.exit()
+
+
+class Stats(NullStats):
+    """Record wall-clock time per phase, input size and issue counts.
+
+    Phases are exclusive: time spent in a nested phase, e.g. fingerprinting while parsing, is not counted in the
+    outer one. Phases of linters running in parallel are summed over the threads.
+    """
+
+    enabled: Final = True  # type: ignore
+
+    def __init__(self) -> None:
+        self.start: Final = time.perf_counter()
+        self.seconds: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.input_bytes = 0
+        self.issues: defaultdict[str, defaultdict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.written = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enter(self, name: str) -> None:
+        # pause the outer phase of this thread
+        now = time.perf_counter()
+        stack: list[list[Any]] = self._local.__dict__.setdefault("stack", [])
+        if stack:
+            self._add(stack[-1][0], now - stack[-1][1])
+        stack.append([name, now])
+
+    def exit(self) -> None:
+        now = time.perf_counter()
+        stack: list[list[Any]] = self._local.stack
+        name, start = stack.pop()
+        self._add(name, now - start)
+        if stack:
+            stack[-1][1] = now
+
+    def _add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[name] += seconds
+
+    def phase(self, name: str) -> AbstractContextManager[object]:
+        return _Phase(self, name)
+
+    def count(self, counts: defaultdict[str, int], issues: Iterable[IssueRecord]) -> None:
+        with self._lock:
+            for issue in issues:
+                counts[issue.severity] += 1
+
+    def chunks(self, chunks: Iterable[str]) -> Iterator[str]:
+        # time spent waiting for linter output, which includes running the linter
+        iterator = iter(chunks)
+        while True:
+            with self.phase("capture"):
+                chunk = next(iterator, None)
+            if chunk is None:
+                return
+            with self._lock:
+                self.input_bytes += len(chunk.encode("utf-8", "replace"))
+            yield chunk
+
+    def parser(self, parser: StreamParser, linter: str) -> StreamParser:
+        return _TimedParser(parser, linter, self)
+
+    def time_fingerprints(self) -> None:
+        # wrap the hash of the current scheme, so that nothing is added to fingerprinting while disabled
+        scheme = GitLabCodeQuality.fingerprint_scheme
+        hasher = GitLabCodeQuality.hasher(scheme)
+
+        def _timed(data: bytes) -> Any:  # noqa: ANN401
+            with self.phase("fingerprint"):
+                return hasher(data)
+
+        _hashers[scheme] = _timed
+
+    def report(self) -> dict[str, object]:
+        import tracemalloc  # noqa: PLC0415
+
+        wall_time = time.perf_counter() - self.start
+        # time not spent in any phase, e.g. starting up
+        self.seconds["other"] = max(0.0, wall_time - sum(self.seconds[name] for name in PHASES if name != "other"))
+        total = sum(sum(counts.values()) for counts in self.issues.values())
+        return {
+            "version": __version__,
+            "wall_time": wall_time,
+            "phases": self.seconds,
+            "input_bytes": self.input_bytes,
+            "issues": {"total": total, "written": self.written, "skipped": self.skipped, "by_linter": self.issues},
+            "issues_per_sec": total / wall_time if wall_time else 0.0,
+            "peak_rss": _peak_rss(),
+            "tracemalloc_peak": tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None,
+        }
+
+    def write(self, path: str | None = None) -> None:
+        text = json.dumps(self.report(), indent=2) + "\n"
+        if path is None:
+            sys.stderr.write(text)
+            return
+        Path(path).write_text(text, encoding="utf-8")
+
+
+class _TimedParser(StreamParser):
+    def __init__(self, parser: StreamParser, linter: str, stats: Stats) -> None:
+        self.parser: Final = parser
+        self.stats: Final = stats
+        self._counts: Final = stats.issues[linter]
+
+    def _count(self, parse: Callable[[], Iterable[IssueRecord]]) -> list[IssueRecord]:
+        # consume lazy results within the phase
+        with self.stats.phase("parse"):
+            issues = list(parse())
+        self.stats.count(self._counts, issues)
+        return issues
+
+    def feed(self, chunk: str) -> list[IssueRecord]:
+        return self._count(lambda: self.parser.feed(chunk))
+
+    def close(self) -> list[IssueRecord]:
+        return self._count(self.parser.close)
+
+
+def _peak_rss() -> int | None:
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:
+        # not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+_stats: NullStats = NullStats()
+
+
+def enable() -> Stats:
+    global _stats  # noqa: PLW0603
+    stats = Stats()
+    stats.time_fingerprints()
+    _stats = stats
+    return stats
+
+
+def get() -> NullStats:
+    return _stats
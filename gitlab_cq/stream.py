@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import re
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Final
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from .record import IssueRecord
+
+_WHITESPACE: Final[re.Pattern[str]] = re.compile(r"[ \t\n\r]*")
+_decoder: Final = json.JSONDecoder()
+
+_LINE_BREAKS: Final[tuple[str, ...]] = ("\n", "\r", "\v", "\f", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029")
+
+
+class StreamParser(ABC):
+    """Incremental parser fed with chunks of linter output, producing `IssueRecord`s.
+
+    The iterables returned by `feed` and `close` must be consumed before the next call.
+    """
+
+    @abstractmethod
+    def feed(self, chunk: str) -> Iterable[IssueRecord]: ...
+
+    @abstractmethod
+    def close(self) -> Iterable[IssueRecord]: ...
+
+    def parse(self, chunks: Iterable[str]) -> Iterator[IssueRecord]:
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.close()
+
+
+class LineParser(StreamParser):
+    """Split the stream into lines (same boundaries as `str.splitlines`) and parse line by line."""
+
+    def __init__(self) -> None:
+        self._partial = ""
+
+    @abstractmethod
+    def parse_line(self, line: str) -> Iterable[IssueRecord]: ...
+
+    def feed(self, chunk: str) -> list[IssueRecord]:
+        if not chunk:
+            return []
+        text = self._partial + chunk
+        lines = text.splitlines()
+        if text.endswith("\r"):
+            # "\r" may be the first half of "\r\n"
+            self._partial = lines.pop() + "\r"
+        elif not text.endswith(_LINE_BREAKS):
+            self._partial = lines.pop()
+        else:
+            self._partial = ""
+        result: list[IssueRecord] = []
+        for line in lines:
+            result.extend(self.parse_line(line))
+        return result
+
+    def close(self) -> list[IssueRecord]:
+        partial, self._partial = self._partial, ""
+        return [issue for line in partial.splitlines() for issue in self.parse_line(line)]
+
+
+class BufferedParser(StreamParser):
+    """Collect the stream and parse it as a whole once it is closed, for formats like a single JSON document."""
+
+    def __init__(self) -> None:
+        self._chunks: list[str] = []
+
+    @abstractmethod
+    def parse_text(self, text: str) -> Iterator[IssueRecord]: ...
+
+    def feed(self, chunk: str) -> tuple[()]:
+        self._chunks.append(chunk)
+        return ()
+
+    def close(self) -> Iterator[IssueRecord]:
+        text = "".join(self._chunks)
+        self._chunks = []
+        return self.parse_text(text)
+
+
+class DedupParser(StreamParser):
+    """Drop issues of `parser` with the fingerprint of an earlier issue.
+
+    E.g. a warning in a header is reported once per translation unit.
+
+    With `count`, issues are held back until the stream is closed, and the number of occurrences is added to the
+    content of repeated issues.
+    """
+
+    def __init__(self, parser: StreamParser, count: bool = False) -> None:
+        self.parser: Final = parser
+        self.count: Final = count
+        self._seen: set[str] = set()
+        self._counted: dict[str, list[Any]] = {}
+
+    def _filter(self, issues: Iterable[IssueRecord]) -> Iterator[IssueRecord]:
+        for issue in issues:
+            if issue.fingerprint is None:
+                issue.add_fingerprint()
+            fingerprint: str = issue.fingerprint  # type: ignore
+            if self.count:
+                counted = self._counted.get(fingerprint)
+                if counted is None:
+                    self._counted[fingerprint] = [issue, 1]
+                else:
+                    counted[1] += 1
+            elif fingerprint not in self._seen:
+                self._seen.add(fingerprint)
+                yield issue
+
+    def feed(self, chunk: str) -> Iterator[IssueRecord]:
+        return self._filter(self.parser.feed(chunk))
+
+    def close(self) -> Iterator[IssueRecord]:
+        yield from self._filter(self.parser.close())
+        for issue, occurrences in self._counted.values():
+            if occurrences > 1:
+                issue.body = (issue.body + "\n\n" if issue.body else "") + f"Reported {occurrences} times"
+            yield issue
+        self._counted = {}
+
+
+def find_json_body(text: str, opening: str, closing: str) -> int:
+    """Return the offset of the first line starting with a JSON array/object (`opening`), or -1.
+
+    Lines of log noise starting with the same character (e.g. "[INFO]") are skipped as long as the next
+    non-whitespace character cannot continue a JSON array of objects or a JSON object.
+    """
+    expected = ("{", closing) if opening == "[" else ('"', closing)
+    pos = 0
+    while True:
+        if text.startswith(opening, pos) and text.startswith(expected, _WHITESPACE.match(text, pos + 1).end()):  # type: ignore
+            return pos
+        pos = text.find("\n" + opening, pos) + 1
+        if pos == 0:
+            return -1
+
+
+def decode_json(text: str, pos: int) -> Any:  # noqa: ANN401
+    # decode in place; anything after the JSON value is ignored
+    return _decoder.raw_decode(text, pos)[0]
+
+
+def iter_json_array(text: str, pos: int) -> Iterator[Any]:
+    """Decode the elements of the JSON array at `pos` one by one; anything after the array is ignored.
+
+    Yields:
+        The decoded elements, each as soon as it is decoded.
+
+    Raises:
+        json.JSONDecodeError: if there is no valid JSON array at `pos`.
+    """
+    if not text.startswith("[", pos):
+        raise json.JSONDecodeError("Expecting '['", text, pos)
+    pos = _WHITESPACE.match(text, pos + 1).end()  # type: ignore
+    if text.startswith("]", pos):
+        return
+    while True:
+        obj, pos = _decoder.raw_decode(text, pos)
+        yield obj
+        pos = _WHITESPACE.match(text, pos).end()  # type: ignore
+        if text.startswith("]", pos):
+            return
+        if not text.startswith(",", pos):
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = _WHITESPACE.match(text, pos + 1).end()  # type: ignore
@@ -0,0 +1,165 @@
+"""Run clang-tidy per translation unit of a compilation database, caching the issues of each unit (--compile-commands).
+
+The issues of a unit are reused while its compile command, its content and the content of the headers it includes
+are unchanged. The headers are listed by the preprocessor of the unit's compiler (`-M`) after clang-tidy ran.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shlex
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Final, NamedTuple
+
+from . import GitLabCodeQuality, capture, paths, report
+from .incremental import data_hash, write_cache
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .record import AnyIssue
+
+CACHE_SUBDIRECTORY: Final[str] = "clang-tidy"
+CACHE_VERSION: Final[int] = 1
+
+# compiler options writing dependencies or output, replaced by -M; the second item tells if a value follows
+_OUTPUT_OPTIONS: Final[dict[str, bool]] = {
+    "-o": True,
+    "-MF": True,
+    "-MT": True,
+    "-MQ": True,
+    "-MD": False,
+    "-MMD": False,
+    "-MP": False,
+    "-c": False,
+}
+# a path in make rules, spaces are escaped with a backslash
+_DEPENDENCY: Final[re.Pattern[str]] = re.compile(r"(?:\\.|[^\s\\])+")
+
+
+class Unit(NamedTuple):
+    directory: str
+    # absolute path of the source file
+    file: str
+    arguments: list[str]
+
+
+def load_units(path: str | os.PathLike[str]) -> list[Unit]:
+    """Return the translation units of the compilation database `path`, once per source file in its order."""
+    units: dict[str, Unit] = {}
+    for entry in json.loads(Path(path).read_text(encoding="utf-8")):
+        directory = entry["directory"]
+        file = os.path.normpath(Path(directory, entry["file"]))
+        arguments = entry["arguments"] if "arguments" in entry else shlex.split(entry["command"])
+        # clang-tidy uses the first command of a file
+        units.setdefault(file, Unit(directory, file, arguments))
+    return list(units.values())
+
+
+def unit_command(command: list[str], unit: Unit) -> list[str]:
+    """Return the clang-tidy `command` run on the source file of `unit`, before compiler arguments given after `--`."""
+    if "--" not in command:
+        return [*command, unit.file]
+    separator = command.index("--")
+    return [*command[:separator], unit.file, *command[separator:]]
+
+
+def _dependency_arguments(unit: Unit) -> list[str]:
+    arguments: list[str] = []
+    skip = False
+    for argument in unit.arguments:
+        if skip:
+            skip = False
+        elif argument in _OUTPUT_OPTIONS:
+            skip = _OUTPUT_OPTIONS[argument]
+        elif not argument.startswith(("-MF", "-MT", "-MQ")) and not (
+            argument.startswith("-o") and not argument.startswith("-obj")
+        ):
+            arguments.append(argument)
+    return [*arguments, "-M"]
+
+
+def parse_dependencies(text: str, directory: str) -> list[str]:
+    # make rule "target: source header ...", continued with a backslash at the end of lines
+    _, _, dependencies = text.replace("\\\n", " ").partition(": ")
+    return [
+        os.path.normpath(Path(directory, match.group().replace("\\ ", " ")))
+        for match in _DEPENDENCY.finditer(dependencies)
+    ]
+
+
+def dependencies(unit: Unit) -> list[str] | None:
+    """Return the files included by `unit`, or None if its compiler cannot list them."""
+    try:
+        result = capture.run(_dependency_arguments(unit), cwd=unit.directory)
+    except OSError:
+        return None
+    if result.returncode:
+        return None
+    return [path for path in parse_dependencies(result.stdout, unit.directory) if path != unit.file]
+
+
+class UnitCache:
+    """Issues of translation units by their compile command and content, valid while their headers are unchanged.
+
+    `options` are the clang-tidy command and options, which also change the issues.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str], options: list[str]) -> None:
+        self.directory: Final = Path(directory) / CACHE_SUBDIRECTORY
+        resolver = paths.get_resolver()
+        self._options = json.dumps([options, GitLabCodeQuality.fingerprint_scheme, resolver.root, resolver.cwd])
+        # content hashes of the files read in this run, headers are shared by many units
+        self._hashes: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    def _hash(self, path: str) -> str | None:
+        with self._lock:
+            if path in self._hashes:
+                return self._hashes[path]
+        try:
+            digest: str | None = data_hash(Path(path).read_bytes())
+        except OSError:
+            digest = None
+        with self._lock:
+            self._hashes[path] = digest
+        return digest
+
+    def _path(self, unit: Unit) -> Path | None:
+        content = self._hash(unit.file)
+        if content is None:
+            return None
+        key = json.dumps([self._options, unit.directory, unit.arguments, unit.file, content])
+        return self.directory / f"{data_hash(key.encode())}.json"
+
+    def get(self, unit: Unit) -> list[GitLabCodeQuality.Issue] | None:
+        path = self._path(unit)
+        if path is None:
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != CACHE_VERSION:
+            return None
+        if any(self._hash(header) != digest for header, digest in data["headers"].items()):
+            return None
+        return data["issues"]
+
+    def put(self, unit: Unit, headers: list[str], issues: Iterable[AnyIssue]) -> None:
+        path = self._path(unit)
+        if path is None:
+            return
+        digests = {header: self._hash(header) for header in headers}
+        if None in digests.values():
+            return
+        cached: list[GitLabCodeQuality.Issue] = []
+        for issue in issues:
+            # cached issues keep their fingerprints
+            report.fingerprint_of(issue)
+            cached.append(issue if isinstance(issue, dict) else issue.issue)
+        data = {"version": CACHE_VERSION, "headers": digests, "issues": cached}
+        write_cache(path, data)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import gitlab_cq
+import pytest
+from gitlab_cq import aio, paths
+
+
+def _fake_linter(path: Path, output: str) -> list[str]:
+    # a script printing `output`, options like --output=json of mypy are added to its arguments
+    path.write_text(f"#!{sys.executable}\nprint({output!r})\n", encoding="utf-8")
+    path.chmod(0o755)
+    return [str(path)]
+
+
+def _mypy_output(*files: str) -> str:
+    return "\n".join(
+        json.dumps({
+            "file": file,
+            "line": 1,
+            "column": 2,
+            "message": "m",
+            "hint": None,
+            "code": "misc",
+            "severity": "error",
+        })
+        for file in files
+    )
+
+
+def test_run(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "sub").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(paths, "_resolver", paths.PathResolver(tmp_path))
+
+    async def main() -> tuple[list[gitlab_cq.GitLabCodeQuality.Issue], list[gitlab_cq.GitLabCodeQuality.Issue]]:
+        return await asyncio.gather(
+            gitlab_cq.run(_fake_linter(tmp_path / "mypy1", _mypy_output("a.py", "b.py")), "mypy"),
+            gitlab_cq.run(_fake_linter(tmp_path / "mypy2", _mypy_output("c.py")), "mypy", cwd=tmp_path / "sub"),
+        )
+
+    first, second = asyncio.run(main())
+    assert [issue["location"]["path"] for issue in first] == ["a.py", "b.py"]
+    assert first[0]["check_name"] == "mypy: misc"
+    # relative to the working directory of the call
+    assert [issue["location"]["path"] for issue in second] == [str(Path("sub", "c.py"))]
+
+
+def test_iter_issues_error(tmp_path: Path) -> None:
+    async def main() -> None:
+        async for _ in gitlab_cq.iter_issues(_fake_linter(tmp_path / "mypy", "{not json"), "mypy"):
+            pass
+
+    with pytest.raises(aio.LinterError, match="Failed to parse linter output"):
+        asyncio.run(main())
+    with pytest.raises(ValueError, match="is not supported"):
+        asyncio.run(gitlab_cq.run(["unknown-linter"]))
+
+
+def test_run_parse_jobs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(paths, "_resolver", paths.PathResolver(tmp_path))
+    output = "a.c:1:1: warning: first [-Wa]\nb.c:2:1: warning: second [-Wb]\n"
+    issues = asyncio.run(gitlab_cq.run(_fake_linter(tmp_path / "gcc", output), "gcc", parse_jobs=2))
+    assert [issue["location"]["path"] for issue in issues] == ["a.c", "b.c"]
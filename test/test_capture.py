@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import sys
+
+from gitlab_cq.capture import Capture, run
+
+script = "import sys; sys.stdout.write('out\\r\\n' * 3); sys.stderr.write('err\\n'); sys.exit(3)"
+
+
+def test_capture_separate_stderr() -> None:
+    result = run([sys.executable, "-c", script])
+    assert result.returncode == 3
+    assert result.stdout == "out\n" * 3
+    assert result.stderr == "err\n"
+
+
+def test_capture_merge_stderr() -> None:
+    result = run([sys.executable, "-c", script], merge_stderr=True)
+    assert result.returncode == 3
+    assert sorted(result.stdout.splitlines()) == ["err", "out", "out", "out"]
+    assert not result.stderr
+
+
+def test_capture_echo(capsys) -> None:
+    with Capture([sys.executable, "-c", script], echo=True) as capture:
+        chunks = list(capture)
+        assert capture.wait() == 3
+    assert "".join(chunks) == "out\n" * 3
+    captured = capsys.readouterr()
+    assert captured.out == "out\n" * 3
+    assert captured.err == "err\n"
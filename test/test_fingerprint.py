@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import copy
+from typing import TYPE_CHECKING, Final
+
+import pytest
+from gitlab_cq import GitLabCodeQuality
+
+if TYPE_CHECKING:
+    from gitlab_cq import FingerprintScheme
+
+issue: Final[GitLabCodeQuality.Issue] = {
+    "type": "issue",
+    "check_name": "gcc: -Wswitch-default",
+    "description": "'switch' missing 'default' label",
+    "categories": ["Bug Risk"],
+    "location": {
+        "path": "test/test_gcc.py",
+        "positions": {"begin": {"line": 453, "column": 17}, "end": {"line": 453, "column": 17}},
+    },
+    "severity": "major",
+}
+
+issue_lines: Final[GitLabCodeQuality.Issue] = {
+    "type": "issue",
+    "check_name": "gcc: -Wswitch-default",
+    "description": "'switch' missing 'default' label",
+    "categories": ["Bug Risk"],
+    "location": {"path": "test/test_gcc.py", "lines": {"begin": 453, "end": 454}},
+}
+
+
+def test_fingerprint_md5() -> None:
+    result = copy.deepcopy(issue)
+    GitLabCodeQuality.add_fingerprint(result)
+    assert result["fingerprint"] == "9c4775cae5499784d55682db1d384ced"
+
+    result = copy.deepcopy(issue_lines)
+    GitLabCodeQuality.add_fingerprint(result)
+    assert result["fingerprint"] == "c4eaadc28eebb4bb17401fe44702e328"
+
+
+@pytest.mark.parametrize("scheme", ["md5", "blake2b"])
+def test_fingerprints(scheme: FingerprintScheme) -> None:
+    single = [copy.deepcopy(issue), copy.deepcopy(issue_lines)]
+    for result in single:
+        GitLabCodeQuality.add_fingerprint(result, scheme)
+    batch = [copy.deepcopy(issue), copy.deepcopy(issue_lines)]
+    GitLabCodeQuality.add_fingerprints(batch, scheme)
+    assert single == batch
+    assert all(len(result["fingerprint"]) == 32 for result in batch)
+    assert batch[0]["fingerprint"] != batch[1]["fingerprint"]
+
+
+def test_fingerprint_no_location() -> None:
+    with pytest.raises(ValueError):
+        GitLabCodeQuality.add_fingerprint({**issue, "location": {"path": "test/test_gcc.py"}})  # type: ignore
@@ -3,7 +3,8 @@ from __future__ import annotations
 from pathlib import Path
 from typing import TYPE_CHECKING, Final
 
-from gitlab_cq.gcc import parse
+from gitlab_cq.gcc import ParallelParser, Parser, iter_parse, parse, read_file, split_output
+from gitlab_cq.stream import DedupParser
 
 if TYPE_CHECKING:
     from gitlab_cq import GitLabCodeQuality
@@ -59,6 +60,11 @@ gcc_issues: Final[list[GitLabCodeQuality.Issue]] = [
             "path": str(Path(__file__).relative_to(Path.cwd())),
             "positions": {"begin": {"line": 41, "column": 28}, "end": {"line": 41, "column": 28}},
         },
+        "other_locations": [
+            {"path": str(Path(__file__).relative_to(Path.cwd())), "lines": {"begin": 1823, "end": 1823}},
+            {"path": str(Path(__file__).relative_to(Path.cwd())), "lines": {"begin": 1808, "end": 1808}},
+            {"path": str(Path(__file__).relative_to(Path.cwd())), "lines": {"begin": 1453, "end": 1453}},
+        ],
         "severity": "major",
         "fingerprint": "ce05830ad965dc8ab362c5ff5ef41655",
     },
@@ -83,6 +89,12 @@ gcc_issues: Final[list[GitLabCodeQuality.Issue]] = [
             "path": str(Path(__file__).relative_to(Path.cwd())),
             "positions": {"begin": {"line": 453, "column": 17}, "end": {"line": 453, "column": 17}},
         },
+        "trace": {
+            "locations": [
+                {"path": str(Path(__file__).relative_to(Path.cwd())), "lines": {"begin": 3, "end": 3}},
+                {"path": str(Path(__file__).relative_to(Path.cwd())), "lines": {"begin": 4, "end": 4}},
+            ]
+        },
         "severity": "major",
         "fingerprint": "9c4775cae5499784d55682db1d384ced",
     },
@@ -95,3 +107,75 @@ def test_gcc_empty() -> None:
 
 def test_gcc() -> None:
     assert parse(gcc_output_str, "gcc", "major") == gcc_issues
+
+
+def test_gcc_chunked() -> None:
+    chunks = [gcc_output_str[i : i + 7] for i in range(0, len(gcc_output_str), 7)]
+    assert list(iter_parse(chunks, "gcc", "major")) == gcc_issues
+
+
+def test_gcc_dedup() -> None:
+    issues = [issue.issue for issue in DedupParser(Parser("gcc", "major")).parse([gcc_output_str * 2])]
+    assert issues == gcc_issues[:3]
+
+    issues = [issue.issue for issue in DedupParser(Parser("gcc", "major"), count=True).parse([gcc_output_str * 2])]
+    assert [issue.get("content") for issue in issues] == [
+        {"body": "Reported 4 times"},
+        {"body": "Reported 2 times"},
+        {"body": "Reported 2 times"},
+    ]
+    assert [issue["fingerprint"] for issue in issues] == [issue["fingerprint"] for issue in gcc_issues[:3]]
+
+
+def test_gcc_groups() -> None:
+    output = (
+        "In file included from a.c:1:\n"
+        "b.h:2:5: warning: array subscript 5 is above array bounds of 'int [4]' [-Warray-bounds]\n"
+        "    2 |     x[5] = 0;\n"
+        "      |     ^~~~\n"
+        "In file included from c.h:3,\n"
+        "                 from a.c:2:\n"
+        "d.h:1:6: note: while referencing 'x'\n"
+        "a.c:9:1: error: conflicting types for 'f' [-Werror]\n"
+    )
+    issues = parse(output, "gcc", "major")
+    assert [issue["check_name"] for issue in issues] == ["gcc: -Warray-bounds", "gcc: -Werror"]
+    assert issues[0]["description"] == "array subscript 5 is above array bounds of 'int [4]'"
+    assert issues[0]["trace"] == {"locations": [{"path": "a.c", "lines": {"begin": 1, "end": 1}}]}
+    assert issues[0]["other_locations"] == [{"path": "d.h", "lines": {"begin": 1, "end": 1}}]
+    # the include chain of the note is not added to the next issue
+    assert "trace" not in issues[1]
+
+
+def test_gcc_file(tmp_path: Path) -> None:
+    log = tmp_path / "build.log"
+    log.write_bytes(gcc_output_str.encode())
+    assert [issue.issue for issue in Parser("gcc", "major").parse(read_file(log))] == gcc_issues
+    log.write_bytes(gcc_output_str.replace("\n", "\r\n").encode())
+    assert [issue.issue for issue in Parser("gcc", "major").parse(read_file(log))] == gcc_issues
+    log.write_bytes(b"")
+    assert list(Parser("gcc", "major").parse(read_file(log))) == []
+
+
+def test_gcc_split_output() -> None:
+    pieces = split_output(gcc_output_str * 3, 12)
+    assert len(pieces) > 1
+    assert "".join(pieces) == gcc_output_str * 3
+    for piece in pieces[1:]:
+        # notes stay with their diagnostic
+        assert piece.startswith(str(Path(__file__).resolve()))
+        assert ": note: " not in piece.partition("\n")[0]
+
+    # the include context stays with the diagnostic after it
+    output = (
+        "a.c:1:1: warning: first [-Wa]\n"
+        "In file included from b.h:3,\n"
+        "                 from a.c:4:\n"
+        "c.h:2:2: warning: second [-Wb]\n"
+    )
+    assert split_output(output, 2) == [output[:30], output[30:]]
+
+
+def test_gcc_parallel() -> None:
+    issues = [issue.issue for issue in ParallelParser("gcc", "major", 2).parse([gcc_output_str * 3])]
+    assert issues == gcc_issues * 3
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import subprocess
+from typing import TYPE_CHECKING
+
+from gitlab_cq import paths
+from gitlab_cq.incremental import Plan, split_arguments
+from gitlab_cq.linters import failed
+from gitlab_cq.record import IssueRecord
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def _issue(path: str) -> IssueRecord:
+    return IssueRecord("Ruff: F401", "`os` imported but unused", path, 1, 8, 1, 10, "minor", "Style")
+
+
+def test_split_arguments(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "src").mkdir()
+    (tmp_path / ".cache").mkdir()
+    (tmp_path / "main.py").touch()
+    (tmp_path / "main.cpp").touch()
+    monkeypatch.chdir(tmp_path)
+    assert split_arguments("ruff", ["check", "--cache-dir", ".cache", "src", "main.py", "--select", "F401"]) == (
+        ["check", "--cache-dir", ".cache", "--select", "F401"],
+        ["src", "main.py"],
+    )
+    # -v takes no value with ruff and mypy, but is the virtual environment directory of pyright
+    assert split_arguments("ruff", ["check", "-v", "src"]) == (["check", "-v"], ["src"])
+    assert split_arguments("mypy", ["-v", "src"]) == (["-v"], ["src"])
+    assert split_arguments("pyright", ["-v", "src", "main.py"]) == (["-v", "src"], ["main.py"])
+    assert split_arguments("clang-tidy", ["-p", "src", "main.cpp", "main.py"]) == (
+        ["-p", "src", "main.py"],
+        ["main.cpp"],
+    )
+
+
+def test_plan(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(paths, "_resolver", paths.PathResolver(tmp_path))
+    for name in ("a.py", "b.py", "c.py"):
+        (tmp_path / name).write_text("import os\n")
+    subprocess.run(["git", "init", "-q"], check=True)
+    subprocess.run(["git", "add", "."], check=True)
+    subprocess.run(
+        ["git", "-c", "user.name=a", "-c", "user.email=a@b", "commit", "-qm", "init"],
+        check=True,
+    )
+    command = ["ruff", "check", "."]
+    cache = tmp_path / "cache"
+
+    # without a cache, the command runs unchanged
+    plan = Plan("ruff", command, "HEAD", cache)
+    assert plan.command == command
+    assert len(list(plan.add([_issue("a.py"), _issue("b.py")]))) == 2
+    assert list(plan.cached()) == []
+    plan.save()
+
+    # nothing changed
+    plan = Plan("ruff", command, "HEAD", cache)
+    assert plan.command is None
+    assert [issue["location"]["path"] for issue in plan.cached()] == ["a.py", "b.py"]
+
+    # changed since the ref, or different from the cache
+    (tmp_path / "b.py").write_text("import sys\n")
+    (tmp_path / "d.py").write_text("import sys\n")
+    plan = Plan("ruff", command, "HEAD", cache)
+    assert plan.command == ["ruff", "check", "--force-exclude", "b.py", "d.py"]
+    list(plan.add([_issue("d.py")]))
+    assert [issue["location"]["path"] for issue in plan.cached()] == ["a.py"]
+    plan.save()
+
+    plan = Plan("ruff", command, "HEAD", cache)
+    assert plan.command == ["ruff", "check", "--force-exclude", "b.py"]
+    assert [issue["location"]["path"] for issue in plan.cached()] == ["a.py", "d.py"]
+
+    # any stale file re-runs mypy on all files, their issues may change as well
+    plan = Plan("mypy", ["mypy", "."], "HEAD", cache)
+    assert plan.command == ["mypy", "."]
+    list(plan.add([_issue("a.py")]))
+    plan.save()
+    plan = Plan("mypy", ["mypy", "."], "HEAD", cache)
+    assert plan.command == ["mypy", "."]
+
+
+def test_failed() -> None:
+    assert not failed("ruff", 1, output=True)
+    assert failed("mypy", 2, output=True)
+    assert failed("pyright", 0, output=False)
+    assert not failed("mypy", 0, output=False)
+    assert not failed("gcc", 1, output=True)
+    assert failed("clang-tidy", 1, output=False)
+    assert failed("ruff", -9, output=True)
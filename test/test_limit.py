@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from gitlab_cq.limit import SUMMARY_CHECK, IssueLimit
+from gitlab_cq.record import IssueRecord
+from gitlab_cq.report import ReportWriter, iter_report
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _issue(line: int, severity: str, path: str = "a.c") -> IssueRecord:
+    return IssueRecord("gcc: -Wall", f"issue {line}", path, line, 1, line, 1, severity, "Bug Risk")  # type: ignore
+
+
+def test_issue_limit() -> None:
+    limit = IssueLimit(3)
+    for issue in [_issue(1, "info"), _issue(2, "major"), _issue(3, "minor"), _issue(4, "blocker"), _issue(5, "major")]:
+        limit.add(issue)
+    limit.add(_issue(4, "blocker"))
+    # most severe, in the order they were added
+    assert [issue.begin_line for issue in limit.issues()] == [2, 4, 5]  # type: ignore
+    assert limit.dropped == {"info": 1, "minor": 1}
+    assert limit.skipped == 1
+    summary = limit.summary()
+    assert summary is not None
+    assert summary["description"] == "2 more issues are not reported, the report is limited to 3 (1 minor, 1 info)"
+
+
+def test_issue_limit_dropped_duplicates() -> None:
+    limit = IssueLimit(1)
+    # dropped when added, and replaced by a more severe issue
+    for issue in [_issue(1, "minor"), _issue(2, "info"), _issue(2, "info"), _issue(3, "major"), _issue(1, "minor")]:
+        limit.add(issue)
+    assert [issue.begin_line for issue in limit.issues()] == [3]  # type: ignore
+    assert limit.dropped == {"minor": 1, "info": 1}
+    assert limit.skipped == 2
+
+
+def test_issue_limit_per_file() -> None:
+    limit = IssueLimit(1, "file")
+    for issue in [_issue(1, "minor", "a.c"), _issue(2, "minor", "b.c"), _issue(3, "major", "a.c")]:
+        limit.add(issue)
+    assert [issue.begin_line for issue in limit.issues()] == [2, 3]  # type: ignore
+    assert limit.dropped == {"minor": 1}
+
+
+def test_report_writer_limit(tmp_path: Path) -> None:
+    path = tmp_path / "report.json"
+    with ReportWriter(path, limit=IssueLimit(1)) as writer:
+        writer.write_all([_issue(1, "minor"), _issue(2, "critical")])
+    issues = list(iter_report(path))
+    assert [issue["location"]["positions"]["begin"]["line"] for issue in issues[:1]] == [2]  # type: ignore
+    assert issues[1]["check_name"] == SUMMARY_CHECK
+
+    # the summary of a merged report is replaced
+    with ReportWriter(path, limit=IssueLimit(1)) as writer:
+        writer.write_all([*issues, _issue(3, "info")])
+    assert list(iter_report(path)) == [
+        issues[0],
+        {**issues[1], "description": issues[1]["description"].replace("minor", "info")},
+    ]
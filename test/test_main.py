@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Final
+
+import pytest
+from gitlab_cq.__main__ import _parse_option_args, _split_commands
+
+# modules the CLI must not import before a linter is selected
+LAZY_MODULES: Final[tuple[str, ...]] = (
+    "gitlab_cq.ruff",
+    "gitlab_cq.pyright",
+    "gitlab_cq.mypy",
+    "gitlab_cq.gcc",
+    "concurrent.futures",
+    "dataclasses",
+    "hashlib",
+    "subprocess",
+    "asyncio",
+    "gzip",
+)
+
+
+def test_split_commands() -> None:
+    assert _split_commands(["ruff", "check", "."]) == [["ruff", "check", "."]]
+    assert _split_commands(["ruff", "check", ".", "--", "pyright", ".", "--", "mypy", "."]) == [
+        ["ruff", "check", "."],
+        ["pyright", "."],
+        ["mypy", "."],
+    ]
+    # separator passed to the linter itself
+    assert _split_commands(["ruff", "check", "--", "main.py"]) == [["ruff", "check", "--", "main.py"]]
+    assert _split_commands(["ruff", "check", "--", "tests/test_mypy.py"]) == [
+        ["ruff", "check", "--", "tests/test_mypy.py"]
+    ]
+    assert _split_commands(["clang-tidy", "main.cpp", "--", "--gcc-toolchain=/opt/gcc-12"]) == [
+        ["clang-tidy", "main.cpp", "--", "--gcc-toolchain=/opt/gcc-12"]
+    ]
+    assert _split_commands(["clang-tidy", "main.cpp", "--", "-std=c++17", "--", "/usr/bin/mypy", "."]) == [
+        ["clang-tidy", "main.cpp", "--", "-std=c++17"],
+        ["/usr/bin/mypy", "."],
+    ]
+
+
+def test_server_options(capsys: pytest.CaptureFixture[str]) -> None:
+    options = _parse_option_args(["--server", "cq.sock", "--echo", "ruff", "check", "."])
+    assert options.server == "cq.sock"
+    assert options.echo
+    # dropped by the client, the daemon uses the options of serve
+    for option in (["--changed-since", "main"], ["--jobs", "2"], ["--max-issues", "10"], ["--output", "cq.json"]):
+        with pytest.raises(SystemExit):
+            _parse_option_args(["--server", "cq.sock", *option, "ruff", "check", "."])
+        assert "Only --echo and --input can be given with --server" in capsys.readouterr().err
+
+
+def test_import_time() -> None:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import gitlab_cq.__main__"],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {line.rpartition("|")[2].strip() for line in result.stderr.splitlines()}
+    assert "gitlab_cq.__main__" in imported
+    assert imported.isdisjoint(LAZY_MODULES), imported.intersection(LAZY_MODULES)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+from gitlab_cq import merge
+from gitlab_cq.merge import sort_issues, sort_key
+from gitlab_cq.record import IssueRecord
+from gitlab_cq.report import ReportWriter, iter_report, open_writer
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+    from gitlab_cq import GitLabCodeQuality
+
+
+def _issue(path: str, line: int) -> GitLabCodeQuality.Issue:
+    issue = IssueRecord("ruff: F401", f"unused {line}", path, line, 1, line, 1, "major", "Style")
+    issue.add_fingerprint()
+    return issue.issue
+
+
+def test_sort_issues(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(merge, "FAN_IN", 2)
+    issues = [_issue(path, line) for path in ("a.py", "b.py", "c.py") for line in range(1, 20)]
+    shuffled = random.Random(0).sample(issues, len(issues))
+    # 12 runs merged in several passes
+    assert list(sort_issues(shuffled, str(tmp_path), run_size=5)) == sorted(issues, key=sort_key)
+    assert list(tmp_path.iterdir()) != []
+    assert list(sort_issues(shuffled, str(tmp_path / "unused"), run_size=100)) == sorted(issues, key=sort_key)
+
+
+def test_merge(tmp_path: Path) -> None:
+    issues = [_issue("b.py", 1), _issue("a.py", 2), _issue("a.py", 1)]
+    first = tmp_path / "first.json"
+    second = tmp_path / "second.jsonl.gz"
+    with ReportWriter(first) as writer:
+        writer.write_all(issues[:2])
+    with open_writer(second) as spool:
+        spool.write_all(issues[1:])
+
+    output = tmp_path / "report.json"
+    with ReportWriter(output) as writer:
+        merge.merge([first, second], writer)
+    assert list(iter_report(output)) == issues
+    assert writer.skipped == 1
+
+    with ReportWriter(output, dedup=False) as writer:
+        merge.merge([first, second], writer, sort=True)
+    assert list(iter_report(output)) == [issues[2], issues[1], issues[0]]
+    assert writer.skipped == 1
@@ -3,7 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import TYPE_CHECKING, Final
 
-from gitlab_cq.mypy import parse
+from gitlab_cq.mypy import iter_parse, parse
 
 if TYPE_CHECKING:
     from gitlab_cq import GitLabCodeQuality
@@ -71,3 +71,8 @@ def test_mypy_empty() -> None:
 def test_mypy() -> None:
     assert parse(mypy_json_str) == mypy_issues
     assert parse(mypy_json_str_with_warn) == mypy_issues
+
+
+def test_mypy_chunked() -> None:
+    chunks = [mypy_json_str_with_warn[i : i + 10] for i in range(0, len(mypy_json_str_with_warn), 10)]
+    assert list(iter_parse(chunks)) == mypy_issues
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from gitlab_cq.paths import PathResolver, find_project_root
+
+
+def test_find_project_root(tmp_path: Path) -> None:
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "src" / "lib").mkdir(parents=True)
+    assert find_project_root(tmp_path / "src" / "lib") == tmp_path
+
+
+def test_path_resolver(tmp_path: Path, monkeypatch) -> None:
+    (tmp_path / "src").mkdir()
+    monkeypatch.chdir(tmp_path / "src")
+    resolver = PathResolver(tmp_path)
+    assert resolver(str(tmp_path / "src" / "main.c")) == str(Path("src", "main.c"))
+    assert resolver("main.c") == str(Path("src", "main.c"))
+    assert resolver("../build/../include/main.h") == str(Path("include", "main.h"))
+    assert resolver("/usr/include/stdio.h") == os.path.normpath("/usr/include/stdio.h")
+    assert resolver.resolve.cache_info().currsize == 4
@@ -92,3 +92,8 @@ def test_pyright_no_error() -> None:
 def test_pyright() -> None:
     assert parse(pyright_json_str) == pyright_issues
     assert parse(pyright_json_str_with_warn) == pyright_issues
+
+
+def test_pyright_noise_around_json() -> None:
+    output = "{not json}\n" + pyright_json_str + "\n0 errors\n"
+    assert parse(output) == pyright_issues
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+import pickle
+import sys
+import typing
+
+import pytest
+from gitlab_cq import GitLabCodeQuality
+from gitlab_cq.record import IssueRecord
+
+
+def test_record() -> None:
+    record = IssueRecord(
+        "Ruff: F401",
+        '`json` imported but unused "é"',
+        "test/test_record.py",
+        3,
+        8,
+        3,
+        12,
+        "minor",
+        "Style",
+        "[F401](https://docs.astral.sh/ruff/rules/unused-import)",
+    )
+    issue = record.issue
+    assert list(issue) == ["type", "check_name", "description", "content", "categories", "location", "severity"]
+    assert record.to_json() == json.dumps(issue)
+
+    record.add_fingerprint()
+    GitLabCodeQuality.add_fingerprint(issue)
+    assert record.issue == issue
+    assert record.to_json() == json.dumps(issue)
+    assert pickle.loads(pickle.dumps(record)) == record
+
+    record.trace = [("test/a.h", 3), ("test/b.c", 4)]
+    record.other_locations = [("test/c.h", 5)]
+    issue = record.issue
+    assert list(issue)[-4:] == ["trace", "other_locations", "severity", "fingerprint"]
+    assert record.to_json() == json.dumps(issue)
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_record_interned() -> None:
+    records = [
+        IssueRecord("gcc: " + "-Wall", "", "".join(["main", ".c"]), 1, 1, 1, 1, "major", "Bug Risk") for _ in range(2)
+    ]
+    assert records[0].check_name is records[1].check_name
+    assert records[0].path is records[1].path
+    assert records[0] == records[1]
+    assert "content" not in records[0].issue
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="the annotations use list[...] and X | Y")
+def test_issue_type_hints() -> None:
+    # resolvable at runtime, e.g. by validation libraries
+    hints = typing.get_type_hints(GitLabCodeQuality.Issue)
+    assert "fingerprint" in hints
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+from gitlab_cq import report
+from gitlab_cq.report import (
+    ReportWriter,
+    finalize,
+    iter_report,
+    load_fingerprints,
+    open_writer,
+    read_spool,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from gitlab_cq import GitLabCodeQuality
+
+issues: list[GitLabCodeQuality.Issue] = [
+    {
+        "type": "issue",
+        "check_name": "gcc: -Wswitch-default",
+        "description": "'switch' missing 'default' label",
+        "categories": ["Bug Risk"],
+        "location": {
+            "path": "main.c",
+            "positions": {"begin": {"line": 4, "column": 2}, "end": {"line": 4, "column": 2}},
+        },
+        "severity": "major",
+        "fingerprint": "9c4775cae5499784d55682db1d384ced",
+    },
+    {
+        "type": "issue",
+        "check_name": "mypy: misc",
+        "description": "List comprehension has incompatible type",
+        "categories": ["Style"],
+        "location": {"path": "main.py", "lines": {"begin": 1, "end": 2}},
+        "severity": "minor",
+        "fingerprint": "d1776315ccd7cedf0995551a826b22d7",
+    },
+]
+
+
+def test_report_writer(tmp_path: Path) -> None:
+    path = tmp_path / "report.json"
+    with ReportWriter(path) as writer:
+        writer.write_all(issues)
+    assert path.read_text() == json.dumps(issues)
+    assert list(iter_report(path)) == issues
+    assert list(tmp_path.iterdir()) == [path]
+
+    with ReportWriter(path):
+        pass
+    assert list(iter_report(path)) == []
+
+
+def test_report_writer_abort(tmp_path: Path) -> None:
+    path = tmp_path / "report.json"
+    path.write_text(json.dumps(issues))
+
+    def _interrupted() -> None:
+        with ReportWriter(path) as writer:
+            writer.write(issues[0])
+            raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        _interrupted()
+    assert list(iter_report(path)) == issues
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_report_writer_stdout(capsys) -> None:
+    with ReportWriter() as writer:
+        writer.write_all(issues)
+    assert capsys.readouterr().out == json.dumps(issues) + "\n"
+
+
+def test_spool(tmp_path: Path) -> None:
+    spool = tmp_path / "report.jsonl"
+    with open_writer(spool) as writer:
+        writer.write(issues[0])
+    with open_writer(spool, merge=True) as writer:
+        writer.write(issues[1])
+    assert spool.read_text() == "".join(json.dumps(issue) + "\n" for issue in issues)
+
+    path = tmp_path / "report.json"
+    assert finalize([spool], path) == 2
+    assert list(iter_report(path)) == issues
+
+    # interrupted append
+    with spool.open("a") as f:
+        f.write(json.dumps(issues[0])[:10])
+    assert list(read_spool(spool)) == issues
+
+
+def test_report_dedup_baseline(tmp_path: Path) -> None:
+    path = tmp_path / "report.json"
+    with ReportWriter(path) as writer:
+        writer.write_all([*issues, *issues])
+    assert list(iter_report(path)) == issues
+    assert writer.skipped == 2
+
+    with open_writer(path, merge=True) as merging:
+        merging.write_all(reversed(issues))
+    assert list(iter_report(path)) == issues
+
+    baseline = load_fingerprints(path)
+    with ReportWriter(path, baseline=baseline) as writer:
+        writer.write_all(issues)
+    assert list(iter_report(path)) == []
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".zst"])
+def test_compressed(tmp_path: Path, suffix: str) -> None:
+    if suffix == ".zst":
+        pytest.importorskip("zstandard")
+    path = tmp_path / f"report.json{suffix}"
+    with open_writer(path, level=1) as writer:
+        writer.write(issues[0])
+    assert path.read_bytes()[:1] != b"["
+    with open_writer(path, merge=True) as writer:
+        writer.write(issues[1])
+    assert list(iter_report(path)) == issues
+
+    # appended spool files are read as one stream
+    spool = tmp_path / f"report.jsonl{suffix}"
+    for issue in issues:
+        with open_writer(spool, merge=True) as writer:
+            writer.write(issue)
+    assert list(read_spool(spool)) == issues
+    assert finalize([spool], tmp_path / "report.json") == 2
+    assert list(iter_report(tmp_path / "report.json")) == issues
+
+
+def test_iter_report(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # issues spanning several chunks
+    monkeypatch.setattr(report, "READ_SIZE", 7)
+    path = tmp_path / "report.json"
+    path.write_text(json.dumps(issues, indent=2))
+    assert list(iter_report(path)) == issues
+    path.write_text(" [ ]\n")
+    assert list(iter_report(path)) == []
+    path.write_text(json.dumps(issues)[:-30])
+    with pytest.raises(ValueError):
+        list(iter_report(path))
@@ -85,3 +85,8 @@ def test_ruff_no_error() -> None:
 def test_ruff() -> None:
     assert parse(ruff_json_str) == ruff_issues
     assert parse(ruff_json_str_with_warn) == ruff_issues
+
+
+def test_ruff_noise_around_json() -> None:
+    output = "[INFO] checking\n" + ruff_json_str + "Found 1 error.\n"
+    assert parse(output) == ruff_issues
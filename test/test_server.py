@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import threading
+from functools import partial
+from typing import TYPE_CHECKING
+
+import pytest
+from gitlab_cq import server
+from gitlab_cq.__main__ import _Options, _serve_request
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+pytestmark = pytest.mark.skipif(not server.is_supported(), reason="requires Unix domain sockets")
+
+gcc_output = b"""main.c:4:2: warning: 'switch' missing 'default' label [-Wswitch-default]
+    4 |  switch (x) {
+      |  ^~~~~~
+"""
+mypy_output = b"""{"file": "main.py", "line": 3, "column": 4, "message": "Name \\"x\\" is not defined", "hint": null, "code": "name-defined", "severity": "error"}
+"""
+
+
+def test_serve(tmp_path: Path) -> None:
+    socket_path = str(tmp_path / "cq.sock")
+    output = tmp_path / "report.json"
+    collector = server.Collector(str(output))
+    thread = threading.Thread(
+        target=server.serve,
+        args=(socket_path, collector, partial(_serve_request, collector=collector, options=_Options())),
+    )
+    thread.start()
+    try:
+        cwd = str(tmp_path)
+        assert server.request(socket_path, {"action": "parse", "linter": "gcc", "cwd": cwd}, [gcc_output]) == {
+            "issues": 1
+        }
+        # already collected
+        assert server.request(socket_path, {"action": "parse", "linter": "gcc", "cwd": cwd}, [gcc_output]) == {
+            "issues": 0
+        }
+        assert "error" in server.request(socket_path, {"action": "parse", "linter": "pylint", "cwd": cwd})
+        assert not output.exists()
+
+        assert server.request(socket_path, {"action": "flush"}) == {"written": 1}
+        assert [issue["check_name"] for issue in json.loads(output.read_text())] == ["gcc: -Wswitch-default"]
+
+        # later flushes keep the issues written before
+        assert server.request(socket_path, {"action": "parse", "linter": "mypy", "cwd": cwd}, [mypy_output]) == {
+            "issues": 1
+        }
+    finally:
+        assert server.request(socket_path, {"action": "stop"}) == {"written": 2}
+        thread.join()
+
+    report = json.loads(output.read_text())
+    assert [issue["check_name"] for issue in report] == ["gcc: -Wswitch-default", "mypy: name-defined"]
+    assert report[1]["location"]["path"] == str(tmp_path / "main.py")
+    assert not (tmp_path / "cq.sock").exists()
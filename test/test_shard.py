@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from gitlab_cq.shard import partition, shard_command
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def test_partition() -> None:
+    sizes = {"a": 10, "b": 10, "c": 10, "d": 10, "e": 40, "f": 0}
+    assert partition(list(sizes), 2, sizes.__getitem__) == [["a", "b", "c", "d"], ["e", "f"]]
+    assert partition(list(sizes), 4, sizes.__getitem__) == [["a", "b"], ["c", "d"], ["e"], ["f"]]
+    assert partition(["a"], 4, sizes.__getitem__) == [["a"]]
+
+
+def test_shard_command(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / ".venv").mkdir()
+    for name in ("src/a.py", "src/pkg/b.py", "src/pkg/c.py", ".venv/d.py", "src/e.txt"):
+        (tmp_path / name).write_text("x = 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    commands = shard_command("ruff", ["ruff", "check", "--select", "F401", "."], 2)
+    options = ["ruff", "check", "--select", "F401", "--force-exclude"]
+    assert [command[:5] for command in commands] == [options] * len(commands)
+    assert [name for command in commands for name in command[5:]] == [
+        str(Path("src", "a.py")),
+        str(Path("src", "pkg", "b.py")),
+        str(Path("src", "pkg", "c.py")),
+    ]
+    assert len(commands) == 3
+    # -v of ruff takes no value, the directory after it is still split
+    commands = shard_command("ruff", ["ruff", "check", "-v", "src"], 2)
+    assert [command[:4] for command in commands] == [["ruff", "check", "-v", "--force-exclude"]] * len(commands)
+    assert [name for command in commands for name in command[4:]] == [
+        str(Path("src", "a.py")),
+        str(Path("src", "pkg", "b.py")),
+        str(Path("src", "pkg", "c.py")),
+    ]
+    assert shard_command("ruff", ["ruff", "check", "src/a.py"], 2) == [["ruff", "check", "src/a.py"]]
+    assert shard_command("gcc", ["make"], 2) == [["make"]]
+
+
+def test_shard_command_exclude(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "src").mkdir()
+    (tmp_path / "vendor").mkdir()
+    for name in ("src/a.py", "src/b.py", "src/c_pb2.py", "vendor/d.py", "e.py"):
+        (tmp_path / name).write_text("x = 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    def files(commands: list[list[str]]) -> list[str]:
+        return [name for command in commands for name in command if name.endswith(".py")]
+
+    # files given explicitly are checked even if excluded, only the configured files are split
+    (tmp_path / "mypy.ini").write_text("[mypy]\nfiles = src, vendor\nexclude = ^vendor/|_pb2\\.py$\n")
+    assert files(shard_command("mypy", ["mypy"], 2)) == [str(Path("src", "a.py")), str(Path("src", "b.py"))]
+    assert files(shard_command("mypy", ["mypy", "--exclude", "^src/a", "."], 2)) == [
+        "e.py",
+        str(Path("src", "b.py")),
+        str(Path("src", "c_pb2.py")),
+        str(Path("vendor", "d.py")),
+    ]
+
+    (tmp_path / "pyrightconfig.json").write_text('{"include": ["src", "vendor"], "exclude": ["vendor", "**/*_pb2.py"]}')
+    assert files(shard_command("pyright", ["pyright"], 2)) == [str(Path("src", "a.py")), str(Path("src", "b.py"))]
+    # an unreadable configuration is left to the linter
+    (tmp_path / "pyrightconfig.json").write_text('{"exclude": ["vendor"], // comment\n}')
+    assert shard_command("pyright", ["pyright", "."], 2) == [["pyright", "."]]
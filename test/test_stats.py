@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from gitlab_cq.gcc import Parser
+from gitlab_cq.stats import NullStats, Stats
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def test_stats_phases(monkeypatch: pytest.MonkeyPatch) -> None:
+    # a clock advanced by the test, sleeping would make the durations depend on the load of the machine
+    now = [0.0]
+    monkeypatch.setattr(time, "perf_counter", lambda: now[0])
+    stats = Stats()
+    with stats.phase("write"):
+        now[0] += 1
+        with stats.phase("parse"):
+            now[0] += 2
+    # nested phases are not counted in the outer one
+    assert stats.seconds["write"] == 1
+    assert stats.seconds["parse"] == 2
+    report = stats.report()
+    assert report["wall_time"] == 3
+
+
+def test_stats_parser() -> None:
+    stats = Stats()
+    output = "a.c:1:1: warning: first [-Wa]\na.c:2:1: warning: second [-Wb]\n"
+    parser = stats.parser(Parser("gcc", "major"), "gcc")
+    assert len(list(parser.parse(stats.chunks([output[:10], output[10:]])))) == 2
+    assert stats.input_bytes == len(output)
+    assert stats.issues == {"gcc": {"major": 2}}
+
+
+def test_null_stats() -> None:
+    stats = NullStats()
+    parser = Parser("gcc", "major")
+    chunks = ["a"]
+    assert stats.parser(parser, "gcc") is parser
+    assert stats.chunks(chunks) is chunks
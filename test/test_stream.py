@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from gitlab_cq.stream import LineParser
+
+if TYPE_CHECKING:
+    from gitlab_cq.record import IssueRecord
+
+
+class _Lines(LineParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines: list[str] = []
+
+    def parse_line(self, line: str) -> list[IssueRecord]:
+        self.lines.append(line)
+        return []
+
+
+def test_line_parser_boundaries() -> None:
+    text = "a\r\nbb\n\nccc\rdd\r\n\u2028e"
+    for size in range(1, len(text) + 1):
+        parser = _Lines()
+        assert list(parser.parse(text[i : i + size] for i in range(0, len(text), size))) == []
+        assert parser.lines == text.splitlines()
+
+
+def test_line_parser_empty() -> None:
+    parser = _Lines()
+    assert list(parser.parse(["", ""])) == []
+    assert parser.lines == []
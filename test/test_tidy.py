@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING
+
+from gitlab_cq.record import IssueRecord
+from gitlab_cq.tidy import Unit, UnitCache, _dependency_arguments, load_units, parse_dependencies, unit_command
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_load_units(tmp_path: Path) -> None:
+    database = tmp_path / "compile_commands.json"
+    database.write_text(
+        json.dumps([
+            {"directory": str(tmp_path / "build"), "file": "../a.cpp", "command": "g++ -DX='a b' -c ../a.cpp -o a.o"},
+            {"directory": str(tmp_path), "file": "b.cpp", "arguments": ["g++", "-c", "b.cpp", "-MD", "-MF", "b.d"]},
+            {"directory": str(tmp_path), "file": "a.cpp", "arguments": ["g++", "-O2", "-c", "a.cpp"]},
+        ])
+    )
+    units = load_units(database)
+    assert [unit.file for unit in units] == [str(tmp_path / "a.cpp"), str(tmp_path / "b.cpp")]
+    assert units[0].arguments == ["g++", "-DX=a b", "-c", "../a.cpp", "-o", "a.o"]
+    assert _dependency_arguments(units[0]) == ["g++", "-DX=a b", "../a.cpp", "-M"]
+    assert _dependency_arguments(units[1]) == ["g++", "b.cpp", "-M"]
+
+
+def test_unit_command() -> None:
+    unit = Unit("/src", "/src/a.cpp", ["g++", "-c", "a.cpp"])
+    assert unit_command(["clang-tidy", "-p", "/src"], unit) == ["clang-tidy", "-p", "/src", "/src/a.cpp"]
+    # the source file is not a compiler argument
+    assert unit_command(["clang-tidy", "--quiet", "--", "-std=c++17"], unit) == [
+        "clang-tidy",
+        "--quiet",
+        "/src/a.cpp",
+        "--",
+        "-std=c++17",
+    ]
+
+
+def test_parse_dependencies() -> None:
+    text = "a.o: ../a.cpp /usr/include/stdio.h \\\n ../include/my\\ header.h\n"
+    assert parse_dependencies(text, "/src/build") == [
+        os.path.normpath("/src/a.cpp"),
+        os.path.normpath("/usr/include/stdio.h"),
+        os.path.normpath("/src/include/my header.h"),
+    ]
+
+
+def test_unit_cache(tmp_path: Path) -> None:
+    source = tmp_path / "a.cpp"
+    header = tmp_path / "a.h"
+    source.write_text('#include "a.h"\n')
+    header.write_text("#define A 1\n")
+    unit = Unit(str(tmp_path), str(source), ["g++", "-c", "a.cpp"])
+    issue = IssueRecord("clang-tidy: modernize-use-auto", "use auto", "a.cpp", 2, 5, 2, 5, "minor", "Bug Risk")
+
+    cache = UnitCache(tmp_path / "cache", ["clang-tidy", "--quiet"])
+    assert cache.get(unit) is None
+    cache.put(unit, [str(header)], [issue])
+    assert UnitCache(tmp_path / "cache", ["clang-tidy", "--quiet"]).get(unit) == [issue.issue]
+
+    # other options, or a changed header
+    assert UnitCache(tmp_path / "cache", ["clang-tidy", "--quiet", "--fix"]).get(unit) is None
+    header.write_text("#define A 2\n")
+    assert UnitCache(tmp_path / "cache", ["clang-tidy", "--quiet"]).get(unit) is None